@@ -1,4 +1,4 @@
-from database import add_quiz
+from database import add_quiz, init_database
 
 # 제공받은 10개의 샘플 퀴즈 데이터
 sample_quizzes = [
@@ -94,4 +94,5 @@ def add_sample_quizzes():
     print(f"\n총 {len(sample_quizzes)}개의 샘플 퀴즈 추가 완료!")
 
 if __name__ == "__main__":
+    init_database()
     add_sample_quizzes() 
\ No newline at end of file
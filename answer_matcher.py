@@ -0,0 +1,118 @@
+import re
+import unicodedata
+
+# 정답 비교
+# 정답과 별칭은 저장할 때 한 번 정규화해 두고(answer_normalized 컬럼), 게임 중에는
+# 사용자 입력만 정규화해서 해시 조회로 비교합니다.
+#   정규화: NFKC (NFC/NFD, 전각 문자 통일) → casefold → 모든 공백 제거
+# 선택적으로 한글을 자모 단위로 풀어 편집 거리가 max_distance 이하인 답도 인정합니다.
+ALIAS_SEPARATOR = ','  # 관리 화면에서 별칭을 구분하는 문자
+KEY_SEPARATOR = '\n'  # answer_normalized 컬럼에 저장할 때 키를 구분하는 문자
+MIN_FUZZY_LENGTH = 4  # 자모 기준 이보다 짧은 정답은 오타 허용 없이 정확히 비교
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_DIGIT_RE = re.compile(r'\d')
+
+# 한글 음절 → 초성/중성/종성 분해용 상수
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_JUNGSEONG_COUNT = 21
+_JONGSEONG_COUNT = 28
+
+def normalize_answer(text):
+    """비교용 정답 키 (NFKC → casefold → 공백 제거)"""
+    if not text:
+        return ''
+    return _WHITESPACE_RE.sub('', unicodedata.normalize('NFKC', text).casefold())
+
+def split_aliases(aliases):
+    """쉼표로 구분된 별칭 문자열을 목록으로 (빈 항목 제외)"""
+    if not aliases:
+        return []
+    return [alias.strip() for alias in aliases.split(ALIAS_SEPARATOR) if alias.strip()]
+
+def answer_keys(answer, aliases=None):
+    """정답과 별칭의 정규화 키 (중복 제거, 저장 순서 유지)"""
+    keys = []
+    for value in [answer] + split_aliases(aliases):
+        key = normalize_answer(value)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+def encode_keys(keys):
+    """answer_normalized 컬럼 저장 형식"""
+    return KEY_SEPARATOR.join(keys)
+
+def decode_keys(value):
+    """answer_normalized 컬럼 값을 조회용 집합으로"""
+    return frozenset(value.split(KEY_SEPARATOR)) if value else frozenset()
+
+def decompose_jamo(text):
+    """한글 음절을 초성/중성/종성 자모로 분해 (한글이 아닌 문자는 그대로)"""
+    result = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = code - _HANGUL_BASE
+            result.append(chr(0x1100 + index // (_JUNGSEONG_COUNT * _JONGSEONG_COUNT)))
+            result.append(chr(0x1161 + index % (_JUNGSEONG_COUNT * _JONGSEONG_COUNT) // _JONGSEONG_COUNT))
+            if index % _JONGSEONG_COUNT:
+                result.append(chr(0x11A7 + index % _JONGSEONG_COUNT))
+        else:
+            result.append(char)
+    return ''.join(result)
+
+def within_distance(a, b, max_distance):
+    """
+    두 문자열의 편집 거리가 max_distance 이하인지 확인
+    대각선 주변 max_distance 폭만 계산하고, 한 행의 최솟값이 기준을 넘으면 바로 중단합니다.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+
+    too_far = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = i
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        row_min = current[0] if low == 1 else too_far
+
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value if value < too_far else too_far
+            if current[j] < row_min:
+                row_min = current[j]
+
+        if row_min > max_distance:
+            return False
+        previous = current
+
+    return previous[len(b)] <= max_distance
+
+def is_correct(user_answer, keys, max_distance=0):
+    """
+    사용자 답이 정답 키 집합(decode_keys 결과)에 맞는지 확인
+    max_distance 가 0보다 크면 숫자가 없는 충분히 긴 정답에 한해 자모 편집 거리도 허용합니다.
+    """
+    key = normalize_answer(user_answer)
+    if not key:
+        return False
+    if key in keys:
+        return True
+    if max_distance <= 0 or _DIGIT_RE.search(key):
+        return False
+
+    user_jamo = decompose_jamo(key)
+    for correct in keys:
+        if _DIGIT_RE.search(correct):
+            continue  # 숫자/비밀번호형 정답은 정확히 일치해야 함
+        correct_jamo = decompose_jamo(correct)
+        if len(correct_jamo) >= MIN_FUZZY_LENGTH and within_distance(user_jamo, correct_jamo, max_distance):
+            return True
+    return False
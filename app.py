@@ -1,11 +1,24 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
+from flask import Flask, current_app, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, abort, Response
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import escape
 from werkzeug.utils import secure_filename
+import codecs
 import os
 import random
+import sqlite3
+import time
 import database
-
-app = Flask(__name__)
-app.secret_key = 'your-secret-key-change-this'
+import answer_matcher
+import game_deck
+import game_session
+import image_pipeline
+import leaderboard_live
+import leaderboard_writer
+import metrics
+import music_catalog
+import quiz_import
+import render_cache
+from game_session import GameState
 
 # 이미지 업로드 설정
 UPLOAD_FOLDER = 'static/images'
@@ -17,63 +30,122 @@ MUSIC_FOLDER = 'static/music'
 ALLOWED_MUSIC_EXTENSIONS = {'mp3', 'wav', 'ogg', 'm4a'}
 MAX_SINGLE_FILE_SIZE = 50 * 1024 * 1024  # 개별 파일 최대 50MB
 MAX_TOTAL_UPLOAD_SIZE = 500 * 1024 * 1024  # 대량 업로드 시 총 500MB까지
+MUSIC_MAX_AGE = 60 * 60  # 같은 이름으로 교체될 수 있으므로 1시간 뒤에는 ETag 로 재검증
+
+# 게임 화면 장면 이미지 표시 너비 (srcset 후보 선택과 preload 힌트에 같은 값 사용)
+SCENE_IMAGE_SIZES = '(max-width: 1200px) 100vw, 650px'
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MUSIC_FOLDER'] = MUSIC_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = MAX_TOTAL_UPLOAD_SIZE  # 전체 요청 크기 제한
+# 관리자 콘솔 목록 페이지 크기
+ADMIN_PAGE_SIZE = 20
+ADMIN_MAX_PAGE_SIZE = 100
 
-# 폴더가 없으면 생성
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(MUSIC_FOLDER, exist_ok=True)
+# 라우트 목록 (create_app() 에서 앱에 등록, 엔드포인트 이름은 함수 이름)
+_routes = []
+
+def route(rule, **options):
+    """create_app() 에서 등록할 뷰 함수 표시 (app.route 와 같은 인자)"""
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
 
 def allowed_file(filename):
     """허용된 파일 확장자인지 확인"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def collect_orphan_images():
+    """어떤 퀴즈도 참조하지 않는 오래된 이미지 정리 (실패해도 요청은 계속 진행)"""
+    try:
+        image_pipeline.collect_orphans(current_app.config['UPLOAD_FOLDER'], database.get_image_paths())
+    except Exception as e:
+        print(f"이미지 정리 오류: {e}")
+
+def add_image_cache_headers(response):
+    """내용 해시 이미지는 URL 이 바뀌지 않는 한 내용도 같으므로 영구 캐시 허용"""
+    if (response.status_code == 200 and request.path.startswith('/static/images/')
+            and image_pipeline.is_immutable_name(request.path)):
+        response.cache_control.public = True
+        response.cache_control.max_age = image_pipeline.IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+def scene_srcset(image_path):
+    """게임 화면용 WebP 파생본 srcset 문자열 (파생본이 없으면 빈 문자열)"""
+    if not image_path:
+        return ''
+    derivatives = image_pipeline.get_derivatives(image_path, current_app.config['UPLOAD_FOLDER'])
+    return ', '.join(f"{url_for('static', filename='images/' + name)} {width}w"
+                     for name, width in derivatives['srcset'])
+
+def scene_thumbnail_url(image_path):
+    """관리자 목록용 썸네일 URL (썸네일이 없으면 원본 URL)"""
+    if not image_path:
+        return None
+    derivatives = image_pipeline.get_derivatives(image_path, current_app.config['UPLOAD_FOLDER'])
+    return url_for('static', filename='images/' + (derivatives['thumbnail'] or image_path))
+
+def highlight_html(text):
+    """검색 결과의 강조 표시 문자를 <mark> 태그로 바꾼 HTML (나머지는 이스케이프)"""
+    return (str(escape(text or ''))
+            .replace(database.HIGHLIGHT_START, '<mark>')
+            .replace(database.HIGHLIGHT_END, '</mark>'))
+
 def allowed_music_file(filename):
     """허용된 음악 파일 확장자인지 확인"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_MUSIC_EXTENSIONS
 
+def get_music_catalog():
+    """배경음악 목록 인덱스"""
+    return music_catalog.get_catalog(current_app.config['MUSIC_FOLDER'], ALLOWED_MUSIC_EXTENSIONS)
+
 def get_random_background_music():
     """랜덤 배경음악 파일 경로 반환"""
     try:
-        music_files = [f for f in os.listdir(MUSIC_FOLDER) 
-                      if allowed_music_file(f)]
-        if music_files:
-            return random.choice(music_files)
-        return None
-    except:
+        track = get_music_catalog().random_track()
+        return track.name if track else None
+    except Exception as e:
+        print(f"배경음악 조회 오류: {e}")
         return None
 
-@app.route('/')
+@route('/')
 def index():
     """메인 페이지 - 게임 시작 화면으로 리디렉트"""
     return redirect(url_for('game_start'))
 
-@app.route('/dashboard')
+@route('/dashboard')
 def dashboard():
-    """대시보드 페이지"""
-    total_quizzes = database.get_quiz_count()
-    quizzes_without_images = len(database.get_quizzes_without_images())
+    """대시보드 페이지 (진행 중인 게임 외의 개수는 트리거/메모리로 유지되는 집계 값, 값이 같으면 캐시된 페이지)"""
+    stats = database.get_stats()
+    
+    try:
+        music_tracks = get_music_catalog().count()
+    except Exception as e:
+        print(f"배경음악 조회 오류: {e}")
+        music_tracks = 0
     
-    return render_template('dashboard.html', 
-                         total_quizzes=total_quizzes,
-                         quizzes_without_images=quizzes_without_images)
+    values = dict(total_quizzes=stats['quizzes'],
+                  quizzes_without_images=stats['quizzes_without_image'],
+                  music_tracks=music_tracks,
+                  leaderboard_entries=stats['leaderboard_entries'],
+                  active_games=game_session.active_game_count())
+    return render_cache.cached_page('dashboard', tuple(values.values()),
+                                    lambda: render_template('dashboard.html', **values))
 
 # 퀴즈 목록 페이지는 관리자 콘솔로 통합됨
-@app.route('/quiz/list')
+@route('/quiz/list')
 def quiz_list():
     """퀴즈 목록 페이지 - 관리자 콘솔로 리다이렉트"""
     return redirect(url_for('admin_console'))
 
-@app.route('/quiz/add')
+@route('/quiz/add')
 def add_quiz_page():
     """퀴즈 추가 페이지"""
     return render_template('add_quiz.html')
 
-@app.route('/quiz/add', methods=['POST'])
+@route('/quiz/add', methods=['POST'])
 def add_quiz():
     """퀴즈 추가 처리"""
     try:
@@ -82,12 +154,14 @@ def add_quiz():
         question = request.form.get('question', '').strip()
         hint = request.form.get('hint', '').strip()
         answer = request.form.get('answer', '').strip()
+        answer_aliases = request.form.get('answer_aliases', '').strip() or None
         
         if not all([room_name, background_description, question, hint, answer]):
             flash('모든 필드를 입력해주세요.', 'error')
             return redirect(url_for('add_quiz_page'))
         
-        quiz_id = database.add_quiz(room_name, background_description, question, hint, answer)
+        quiz_id = database.add_quiz(room_name, background_description, question, hint, answer,
+                                    answer_aliases=answer_aliases)
         flash(f'퀴즈가 성공적으로 추가되었습니다! (ID: {quiz_id})', 'success')
         return redirect(url_for('quiz_detail', quiz_id=quiz_id))
         
@@ -95,21 +169,26 @@ def add_quiz():
         flash(f'퀴즈 추가 중 오류가 발생했습니다: {str(e)}', 'error')
         return redirect(url_for('add_quiz_page'))
 
-@app.route('/quiz/<int:quiz_id>')
+@route('/quiz/<int:quiz_id>')
 def quiz_detail(quiz_id):
-    """퀴즈 상세 페이지"""
+    """퀴즈 상세 페이지 (퀴즈 데이터 버전이 같으면 캐시된 페이지)"""
+    # 버전을 먼저 읽어야 캐시 키보다 오래된 내용이 그 키로 저장되지 않음
+    # (이전/다음 링크도 다른 퀴즈의 추가/삭제에 따라 바뀌므로 전체 퀴즈 버전을 키로 사용)
+    version = database.get_catalog_version()
     quiz = database.get_quiz_by_id(quiz_id)
     if not quiz:
         flash('퀴즈를 찾을 수 없습니다.', 'error')
         return redirect(url_for('admin_console'))
     
-    # 다음/이전 퀴즈 ID 가져오기
-    prev_quiz_id, next_quiz_id = database.get_next_prev_quiz_ids(quiz_id)
+    def render():
+        # 다음/이전 퀴즈 ID 가져오기
+        prev_quiz_id, next_quiz_id = database.get_next_prev_quiz_ids(quiz_id)
+        return render_template('quiz_detail.html', quiz=quiz, 
+                             prev_quiz_id=prev_quiz_id, next_quiz_id=next_quiz_id)
     
-    return render_template('quiz_detail.html', quiz=quiz, 
-                         prev_quiz_id=prev_quiz_id, next_quiz_id=next_quiz_id)
+    return render_cache.cached_page('quiz_detail', (quiz_id, version), render)
 
-@app.route('/quiz/<int:quiz_id>/edit')
+@route('/quiz/<int:quiz_id>/edit')
 def edit_quiz_page(quiz_id):
     """퀴즈 편집 페이지"""
     quiz = database.get_quiz_by_id(quiz_id)
@@ -123,7 +202,7 @@ def edit_quiz_page(quiz_id):
     return render_template('edit_quiz.html', quiz=quiz, 
                          prev_quiz_id=prev_quiz_id, next_quiz_id=next_quiz_id)
 
-@app.route('/quiz/<int:quiz_id>/update', methods=['POST'])
+@route('/quiz/<int:quiz_id>/update', methods=['POST'])
 def update_quiz_route(quiz_id):
     """퀴즈 업데이트 처리"""
     try:
@@ -137,6 +216,7 @@ def update_quiz_route(quiz_id):
         question = request.form.get('question', '').strip()
         hint = request.form.get('hint', '').strip()
         answer = request.form.get('answer', '').strip()
+        answer_aliases = request.form.get('answer_aliases', '').strip()
         
         if not all([room_name, background_description, question, hint, answer]):
             flash('모든 필드를 입력해주세요.', 'error')
@@ -146,7 +226,8 @@ def update_quiz_route(quiz_id):
         current_image_path = quiz[6]  # image_path는 인덱스 6
         
         success = database.update_quiz(quiz_id, room_name, background_description, 
-                                     question, hint, answer, current_image_path)
+                                     question, hint, answer, current_image_path,
+                                     answer_aliases=answer_aliases)
         
         if success:
             flash('퀴즈가 성공적으로 수정되었습니다!', 'success')
@@ -159,7 +240,7 @@ def update_quiz_route(quiz_id):
         flash(f'퀴즈 수정 중 오류가 발생했습니다: {str(e)}', 'error')
         return redirect(url_for('edit_quiz_page', quiz_id=quiz_id))
 
-@app.route('/quiz/<int:quiz_id>/delete', methods=['POST'])
+@route('/quiz/<int:quiz_id>/delete', methods=['POST'])
 def delete_quiz_route(quiz_id):
     """퀴즈 삭제 처리"""
     try:
@@ -168,11 +249,12 @@ def delete_quiz_route(quiz_id):
             flash('퀴즈를 찾을 수 없습니다.', 'error')
             return redirect(url_for('admin_console'))
         
-        # 이미지 파일이 있다면 삭제
+        # 이미지 파일이 있다면 파생본과 함께 삭제
         if quiz[6]:  # image_path
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], quiz[6])
+            image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], quiz[6])
             if os.path.exists(image_path):
                 os.remove(image_path)
+            image_pipeline.delete_derivatives(quiz[6], current_app.config['UPLOAD_FOLDER'])
         
         success = database.delete_quiz(quiz_id)
         
@@ -186,7 +268,7 @@ def delete_quiz_route(quiz_id):
     
     return redirect(url_for('admin_console'))
 
-@app.route('/quiz/<int:quiz_id>/upload-image', methods=['POST'])
+@route('/quiz/<int:quiz_id>/upload-image', methods=['POST'])
 def upload_quiz_image(quiz_id):
     """퀴즈 이미지 업로드 처리"""
     try:
@@ -205,28 +287,40 @@ def upload_quiz_image(quiz_id):
         if not allowed_file(file.filename):
             return jsonify({'success': False, 'message': f'허용되지 않는 파일 형식입니다. ({", ".join(ALLOWED_EXTENSIONS)}만 가능)'})
         
-        # 기존 이미지 파일 삭제
-        old_image_path = quiz[6]  # image_path
-        if old_image_path:
-            old_file_path = os.path.join(app.config['UPLOAD_FOLDER'], old_image_path)
-            if os.path.exists(old_file_path):
-                os.remove(old_file_path)
-        
-        # 새 파일명 생성 (quiz_id를 포함하여 고유하게)
+        # 파일 확장자 결정
         if file.filename and '.' in file.filename:
             file_extension = file.filename.rsplit('.', 1)[1].lower()
         else:
             file_extension = 'png'  # 기본 확장자
-        new_filename = f'quiz_{quiz_id}_scene.{file_extension}'
         
-        # 파일 저장
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], new_filename)
-        file.save(file_path)
+        # 내용 해시 파일명으로 저장 (quiz_{id}_{해시}.{확장자})
+        # 이전 이미지는 바로 지우지 않고, 참조가 끊긴 뒤 정리 작업에서 삭제
+        old_image_path = quiz[6]  # image_path
+        new_filename = image_pipeline.save_hashed(file.stream, current_app.config['UPLOAD_FOLDER'],
+                                                  quiz_id, file_extension)
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], new_filename)
+        
+        if new_filename == old_image_path:
+            return jsonify({
+                'success': True, 
+                'message': '이미 같은 이미지가 등록되어 있습니다.',
+                'image_path': new_filename
+            })
+        
+        # 썸네일 및 WebP 파생본 생성 (실패해도 원본으로 서비스 가능)
+        try:
+            image_pipeline.generate_derivatives(new_filename, current_app.config['UPLOAD_FOLDER'])
+        except Exception as e:
+            print(f"이미지 파생본 생성 오류: {e}")
         
         # 데이터베이스 업데이트
         success = database.update_quiz_image(quiz_id, new_filename)
         
         if success:
+            # 이전 이미지는 지금부터 유예 기간이 지나면 정리되도록 수정 시각 갱신
+            if old_image_path:
+                image_pipeline.mark_replaced(old_image_path, current_app.config['UPLOAD_FOLDER'])
+            collect_orphan_images()
             return jsonify({
                 'success': True, 
                 'message': '이미지가 성공적으로 업로드되었습니다!',
@@ -236,82 +330,181 @@ def upload_quiz_image(quiz_id):
             # 파일은 저장되었지만 DB 업데이트 실패 시 파일 삭제
             if os.path.exists(file_path):
                 os.remove(file_path)
+            image_pipeline.delete_derivatives(new_filename, current_app.config['UPLOAD_FOLDER'])
             return jsonify({'success': False, 'message': '데이터베이스 업데이트에 실패했습니다.'})
             
     except Exception as e:
         return jsonify({'success': False, 'message': f'이미지 업로드 중 오류가 발생했습니다: {str(e)}'})
 
-@app.route('/admin')
+@route('/admin/quiz/images/bulk-upload', methods=['POST'])
+def bulk_upload_quiz_images():
+    """
+    장면 이미지 일괄 업로드 (파일명 quiz_{퀴즈ID}_manual.png 로 퀴즈를 찾음)
+    검사와 파생본 생성은 작업 스레드에서 병렬로 하고, 바뀐 이미지 경로는 한 트랜잭션으로 반영합니다.
+    """
+    try:
+        files = [file for file in request.files.getlist('images') if file.filename]
+        if not files:
+            return jsonify({'success': False, 'message': '이미지 파일이 선택되지 않았습니다.'})
+        
+        report = image_pipeline.ingest_images([(file.filename, file.stream) for file in files],
+                                              current_app.config['UPLOAD_FOLDER'])
+        if report['updated']:
+            collect_orphan_images()
+        
+        message = f"{report['updated']}개 이미지를 등록했습니다."
+        if report['unchanged']:
+            message += f" (변경 없음: {report['unchanged']}개)"
+        if report['failed']:
+            message += f" (실패: {report['failed']}개)"
+        
+        return jsonify({'success': report['failed'] < report['total'], 'message': message, **report})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'이미지 일괄 업로드 중 오류가 발생했습니다: {str(e)}'})
+
+@route('/admin')
 def admin_console():
-    """관리자 콘솔 페이지"""
-    all_quizzes = database.get_all_quizzes()
-    quizzes_without_images = database.get_quizzes_without_images()
+    """관리자 콘솔 페이지 (퀴즈 목록은 /admin/api/quizzes 로 스크롤하며 불러옴)"""
+    stats = database.get_stats()
     
-    # 배경음악 파일 목록 가져오기
-    music_files = []
+    # 배경음악 목록 (이름, 크기, 재생 시간)
     try:
-        music_files = [f for f in os.listdir(MUSIC_FOLDER) 
-                      if allowed_music_file(f)]
-    except:
-        music_files = []
+        catalog = get_music_catalog()
+        music_version = catalog.version
+        music_files = catalog.tracks()
+    except Exception as e:
+        print(f"배경음악 조회 오류: {e}")
+        music_version, music_files = None, []
+    
+    # 개수와 배경음악 목록이 같으면 캐시된 페이지
+    key = (stats['quizzes'], stats['quizzes_without_image'], music_version)
+    return render_cache.cached_page('admin_console', key, lambda: render_template(
+        'admin_console.html', 
+        total_quizzes=stats['quizzes'],
+        quizzes_without_images=stats['quizzes_without_image'],
+        music_files=music_files))
+
+@route('/admin/api/quizzes')
+def admin_quiz_page():
+    """관리자 퀴즈 목록 API (keyset 페이지네이션)"""
+    sort = request.args.get('sort', 'newest')
+    if sort not in database.QUIZ_PAGE_SORTS:
+        return jsonify({'success': False, 'message': '지원하지 않는 정렬 방식입니다.'}), 400
+    
+    image_filter = request.args.get('filter', 'all')
+    if image_filter not in ('all', 'no-image', 'has-image'):
+        return jsonify({'success': False, 'message': '지원하지 않는 필터입니다.'}), 400
+    
+    limit = min(max(request.args.get('limit', ADMIN_PAGE_SIZE, type=int), 1), ADMIN_MAX_PAGE_SIZE)
+    search = request.args.get('q', '').strip()
+    cursor = request.args.get('cursor')
+    
+    if search:
+        # 검색 결과는 관련도 순이므로 커서는 다음 페이지 시작 위치(offset), sort 는 무시
+        if cursor and not cursor.isdigit():
+            return jsonify({'success': False, 'message': '잘못된 커서입니다.'}), 400
+        rows, next_offset = database.search_quizzes(search, limit, int(cursor or 0), image_filter)
+        next_cursor = str(next_offset) if next_offset is not None else None
+    else:
+        # 커서는 "created_at|id" 형태의 불투명 문자열
+        cursor_key = None
+        if cursor:
+            created_at, _, quiz_id = cursor.rpartition('|')
+            if not created_at or not quiz_id.isdigit():
+                return jsonify({'success': False, 'message': '잘못된 커서입니다.'}), 400
+            cursor_key = (created_at, int(quiz_id))
+        rows, next_key = database.get_quiz_page(cursor_key, limit, image_filter, sort)
+        next_cursor = f'{next_key[0]}|{next_key[1]}' if next_key else None
+    
+    quizzes = []
+    for row in rows:
+        quiz = {
+            'id': row[0],
+            'room_name': row[1],
+            'image_path': row[2],
+            'image_url': url_for('static', filename='images/' + row[2]) if row[2] else None,
+            'thumbnail_url': scene_thumbnail_url(row[2]),
+            'created_at': row[3],
+            'question_preview': row[4]
+        }
+        if search:
+            # 일치한 부분을 <mark> 로 감싼 HTML (나머지는 이스케이프됨)
+            quiz['room_name_html'] = highlight_html(row[5])
+            quiz['snippet_html'] = highlight_html(row[6])
+        quizzes.append(quiz)
     
-    return render_template('admin_console.html', 
-                         all_quizzes=all_quizzes,
-                         quizzes_without_images=quizzes_without_images,
-                         music_files=music_files)
+    return jsonify({
+        'success': True,
+        'quizzes': quizzes,
+        'next_cursor': next_cursor
+    })
 
-@app.route('/admin/music/bulk-upload', methods=['POST'])
+@route('/admin/quiz/import', methods=['POST'])
+def import_quizzes():
+    """
+    퀴즈 대량 가져오기 (텍스트 파일 또는 붙여넣은 텍스트)
+    모든 블록을 검사한 뒤 통과한 퀴즈를 한 트랜잭션으로 추가하고 블록별 결과를 반환합니다.
+    """
+    try:
+        # 업로드 파일은 통째로 읽지 않고 줄 단위로 파서에 넘김
+        # (Python 3.10 의 SpooledTemporaryFile 은 readable() 이 없어 TextIOWrapper 로 감쌀 수 없으므로
+        #  바이트 줄을 점진적으로 디코딩, 줄 끝의 \r\n 은 파서가 정리)
+        file = request.files.get('quiz_file')
+        if file and file.filename:
+            lines = codecs.iterdecode(file.stream, 'utf-8-sig')
+        else:
+            lines = request.form.get('quiz_text', '').splitlines()
+        
+        dry_run = request.form.get('dry_run') == 'true'
+        report = quiz_import.import_quiz_lines(lines, dry_run=dry_run,
+                                               strict=request.form.get('strict') == 'true')
+        
+        if not report['total']:
+            return jsonify({'success': False, 'message': '가져올 퀴즈가 없습니다.'})
+        
+        if dry_run:
+            success = report['failed'] < report['total']
+            message = f"{report['total'] - report['failed']}개 퀴즈를 추가할 수 있습니다."
+        else:
+            success = report['imported'] > 0
+            message = f"{report['imported']}개 퀴즈를 추가했습니다." if success else '추가된 퀴즈가 없습니다.'
+        if report['failed']:
+            message += f" (실패: {report['failed']}개)"
+        
+        return jsonify({'success': success, 'message': message, **report})
+        
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'message': 'UTF-8 텍스트 파일만 가져올 수 있습니다.'})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'퀴즈 가져오기 중 오류가 발생했습니다: {str(e)}'})
+
+@route('/admin/music/bulk-upload', methods=['POST'])
 def bulk_upload_music():
-    """대량 배경음악 업로드 처리"""
+    """
+    대량 배경음악 업로드 처리
+    request.files 로 전체 요청을 임시 저장하지 않고 request.stream 을 읽으면서 파일별로 바로 저장합니다.
+    """
     try:
-        if 'music_files' not in request.files:
+        boundary = request.mimetype_params.get('boundary')
+        if request.mimetype != 'multipart/form-data' or not boundary:
             return jsonify({'success': False, 'message': '파일이 선택되지 않았습니다.'})
         
-        files = request.files.getlist('music_files')
+        results = music_catalog.receive_uploads(request.stream, boundary, get_music_catalog(),
+                                                MAX_SINGLE_FILE_SIZE)
         
-        if not files or files[0].filename == '':
+        if not results:
             return jsonify({'success': False, 'message': '파일이 선택되지 않았습니다.'})
         
-        uploaded_count = 0
-        error_messages = []
-        
-        for file in files:
-            if file and file.filename:
-                # 파일 확장자 검증
-                if not allowed_music_file(file.filename):
-                    error_messages.append(f'{file.filename}: 지원하지 않는 파일 형식입니다.')
-                    continue
-                
-                # 파일 크기 검증
-                file.seek(0, 2)  # 파일 끝으로 이동
-                file_size = file.tell()
-                file.seek(0)  # 파일 시작으로 복귀
-                
-                if file_size > MAX_SINGLE_FILE_SIZE:
-                    error_messages.append(f'{file.filename}: 파일 크기가 50MB를 초과합니다.')
-                    continue
-                
-                # 파일명 보안 처리
-                filename = secure_filename(file.filename)
-                
-                # 중복 파일명 처리
-                base_name, ext = os.path.splitext(filename)
-                counter = 1
-                original_filename = filename
-                
-                while os.path.exists(os.path.join(MUSIC_FOLDER, filename)):
-                    filename = f"{base_name}_{counter}{ext}"
-                    counter += 1
-                
-                try:
-                    file.save(os.path.join(MUSIC_FOLDER, filename))
-                    uploaded_count += 1
-                except Exception as e:
-                    error_messages.append(f'{original_filename}: 업로드 실패 - {str(e)}')
+        uploaded_count = sum(1 for r in results if r['status'] == 'uploaded')
+        duplicate_count = sum(1 for r in results if r['status'] == 'duplicate')
+        error_messages = [f"{r['filename']}: {r['message']}" for r in results if r['status'] == 'error']
         
         # 결과 메시지 구성
-        if uploaded_count > 0:
+        if uploaded_count > 0 or duplicate_count > 0:
             success_message = f'{uploaded_count}개 파일이 성공적으로 업로드되었습니다.'
+            if duplicate_count:
+                success_message += f' (중복: {duplicate_count}개)'
             if error_messages:
                 success_message += f' (실패: {len(error_messages)}개)'
             
@@ -319,26 +512,30 @@ def bulk_upload_music():
                 'success': True, 
                 'message': success_message,
                 'uploaded_count': uploaded_count,
-                'errors': error_messages
+                'duplicate_count': duplicate_count,
+                'errors': error_messages,
+                'results': results
             })
         else:
             return jsonify({
                 'success': False, 
                 'message': '업로드된 파일이 없습니다.',
-                'errors': error_messages
+                'errors': error_messages,
+                'results': results
             })
             
     except Exception as e:
         return jsonify({'success': False, 'message': f'업로드 중 오류가 발생했습니다: {str(e)}'})
 
-@app.route('/admin/music/delete/<filename>', methods=['POST'])
+@route('/admin/music/delete/<filename>', methods=['POST'])
 def delete_music(filename):
     """배경음악 삭제"""
     try:
-        file_path = os.path.join(app.config['MUSIC_FOLDER'], secure_filename(filename))
+        file_path = os.path.join(current_app.config['MUSIC_FOLDER'], secure_filename(filename))
         
         if os.path.exists(file_path):
             os.remove(file_path)
+            get_music_catalog().invalidate()
             return jsonify({'success': True, 'message': '배경음악이 삭제되었습니다.'})
         else:
             return jsonify({'success': False, 'message': '파일을 찾을 수 없습니다.'})
@@ -346,100 +543,225 @@ def delete_music(filename):
     except Exception as e:
         return jsonify({'success': False, 'message': f'음악 삭제 중 오류가 발생했습니다: {str(e)}'})
 
-@app.route('/api/random-music')
+@route('/admin/metrics')
+def admin_metrics():
+    """Prometheus 형식 지표 (METRICS_TOKEN 이 있으면 Bearer 토큰, 없으면 loopback 에서만 허용)"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            abort(403)
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+    
+    gauges = {
+        'active_game_sessions': ('만료되지 않은 게임 세션 수', game_session.active_game_count()),
+        'stored_game_sessions': ('저장된 게임 세션 수 (만료 후 정리 전 세션 포함, 트리거 집계)',
+                                 database.get_stats()['game_sessions']),
+        'leaderboard_write_pending': ('이 워커에서 저장을 기다리는 리더보드 기록 수',
+                                      leaderboard_writer.get_writer().pending
+                                      if current_app.config['LEADERBOARD_WRITE_BEHIND'] else 0),
+        'render_cache_entries': ('이 워커의 렌더링 캐시 항목 수', len(render_cache.get_cache())),
+        'render_cache_bytes': ('이 워커의 렌더링 캐시 본문 크기 합계', render_cache.get_cache().size),
+    }
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@route('/healthz')
+def healthz():
+    """liveness 확인 (프로세스가 요청에 응답하는지만 확인, DB 는 보지 않음)"""
+    return jsonify({'status': 'ok'})
+
+@route('/readyz')
+def readyz():
+    """readiness 확인 (캐시 예열이 끝났고 DB 를 조회할 수 있는지)"""
+    if not current_app.config.get('WARMED_UP'):
+        return jsonify({'status': 'warming'}), 503
+    try:
+        database.get_quiz_count()
+    except sqlite3.Error as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'status': 'ready'})
+
+@route('/api/random-music')
 def get_random_music():
     """랜덤 배경음악 API"""
     music_file = get_random_background_music()
     if music_file:
-        return jsonify({'success': True, 'music_file': music_file})
+        return jsonify({'success': True, 'music_file': music_file,
+                        'url': url_for('stream_music', filename=music_file)})
     else:
         return jsonify({'success': False, 'message': '배경음악이 없습니다.'})
 
+@route('/music/<path:filename>')
+def stream_music(filename):
+    """
+    배경음악 스트리밍 (Range 요청, ETag, 304 지원)
+    탐색이나 이어 재생 시 필요한 구간만 보내고, 바뀌지 않은 파일은 다시 보내지 않습니다.
+    """
+    track = get_music_catalog().get(filename)
+    if track is None:
+        abort(404)
+    
+    response = send_from_directory(current_app.config['MUSIC_FOLDER'], track.name,
+                                   conditional=True, etag=track.etag,
+                                   last_modified=track.mtime, max_age=MUSIC_MAX_AGE)
+    # 첫 응답부터 구간 요청이 가능함을 알려 브라우저가 탐색 시 Range 를 사용하도록 함
+    response.accept_ranges = 'bytes'
+    return response
+
 # ==================== 플레이어 게임 라우트 ====================
 
-@app.route('/play')
+@route('/play')
 def game_start():
     """게임 시작 화면"""
     return render_template('game/start.html')
 
-@app.route('/play/enter', methods=['POST'])
+@route('/play/enter', methods=['POST'])
 def game_enter():
     """게임 입장 - 새 게임 세션 시작"""
-    import time
-    
-    # 게임 세션 초기화
-    session['game_active'] = True
-    session['current_round'] = 1
-    session['total_rounds'] = random.randint(5, 20)  # 5~20 라운드 랜덤
-    session['lives'] = 3  # 목숨 3개
-    session['hints_used'] = 0  # 사용한 힌트 수
-    session['max_hints'] = 5  # 최대 힌트 수
-    session['completed_quiz_ids'] = []  # 완료한 퀴즈 ID들
-    session['current_quiz_id'] = None
-    session['start_time'] = time.time()  # 게임 시작 시간 기록
+    # 게임 세션 초기화 (5~20 라운드 랜덤, 목숨 3개, 최대 힌트 5개)
+    game = GameState(total_rounds=random.randint(5, 20), lives=3, max_hints=5)
+    game_session.start_game(game)
     
     # 첫 번째 퀴즈 선택
     return redirect(url_for('game_play'))
 
-@app.route('/play/game')
+def draw_room(game):
+    """덱에서 다음 방을 뽑아 현재 방으로 지정 (게임 중 퀴즈가 추가/삭제되어도 덱은 그대로, 다 돌면 새로 섞음, 퀴즈가 없으면 None)"""
+    quiz_id, game.deck = game_deck.draw(game.deck, database.get_quiz_ids())
+    quiz = database.get_quiz_by_id(quiz_id) if quiz_id else None
+    game.current_quiz_id = quiz[0] if quiz else None
+    return quiz
+
+def current_room(game):
+    """
+    지금 풀어야 할 방 (아직 뽑지 않았거나 삭제되었으면 새로 뽑아 저장)
+    새로고침해도 같은 방이 나오며, 정답을 맞히면 game_answer() 가 다음 방을 미리 뽑아 둡니다.
+    """
+    quiz = database.get_quiz_by_id(game.current_quiz_id) if game.current_quiz_id else None
+    if quiz is None:
+        quiz = draw_room(game)
+        game_session.save_game(game)
+    return quiz
+
+def game_redirect(game):
+    """게임을 계속할 수 없을 때 이동할 화면 URL (계속할 수 있으면 None)"""
+    if not game or not game.active:
+        return url_for('game_start')
+    if game.current_round > game.total_rounds:
+        return url_for('game_clear')
+    if game.lives <= 0:
+        return url_for('game_over')
+    return None
+
+def room_payload(quiz):
+    """화면에 보여줄 방 정보 (정답과 힌트는 포함하지 않음)"""
+    image_path = quiz[6]
+    return {
+        'id': quiz[0],
+        'room_name': quiz[1],
+        'background_description': quiz[2],
+        'question': quiz[3],
+        'image_url': url_for('static', filename='images/' + image_path) if image_path else None,
+        'image_srcset': scene_srcset(image_path),
+    }
+
+def game_state_payload(game, quiz):
+    """게임 진행 상태와 현재 방 (JSON 응답용)"""
+    return {
+        'round': game.current_round,
+        'total_rounds': game.total_rounds,
+        'lives': game.lives,
+        'hints_used': game.hints_used,
+        'max_hints': game.max_hints,
+        'room': room_payload(quiz),
+    }
+
+def add_scene_preload(response, room):
+    """장면 이미지 preload 힌트를 Link 헤더로 추가 (이미지가 없으면 그대로)"""
+    if room['image_url']:
+        link = f'<{room["image_url"]}>; rel=preload; as=image'
+        if room['image_srcset']:
+            link += f'; imagesrcset="{room["image_srcset"]}"; imagesizes="{SCENE_IMAGE_SIZES}"'
+        response.headers.add('Link', link)
+    return response
+
+@route('/play/game')
 def game_play():
-    """게임 플레이 화면"""
-    if not session.get('game_active'):
-        return redirect(url_for('game_start'))
-    
-    # 현재 라운드가 총 라운드를 초과하면 클리어
-    if session['current_round'] > session['total_rounds']:
-        return redirect(url_for('game_clear'))
-    
-    # 목숨이 0이면 게임 오버
-    if session['lives'] <= 0:
-        return redirect(url_for('game_over'))
-    
-    # 새 퀴즈 선택 (이미 완료한 퀴즈 제외)
-    all_quizzes = database.get_all_quizzes()
-    available_quizzes = [q for q in all_quizzes if q[0] not in session['completed_quiz_ids']]
+    """게임 플레이 화면 (이후 방 전환은 JSON 응답으로 화면 안에서 처리)"""
+    game = game_session.load_game()
+    redirect_url = game_redirect(game)
+    if redirect_url:
+        return redirect(redirect_url)
     
-    if not available_quizzes:
-        # 모든 퀴즈를 다 풀었으면 처음부터 다시
-        session['completed_quiz_ids'] = []
-        available_quizzes = all_quizzes
-    
-    current_quiz = random.choice(available_quizzes)
-    session['current_quiz_id'] = current_quiz[0]
+    current_quiz = current_room(game)
+    if not current_quiz:
+        return redirect(url_for('game_start'))
     
     return render_template('game/play.html', 
                          quiz=current_quiz,
-                         current_round=session['current_round'],
-                         total_rounds=session['total_rounds'],
-                         lives=session['lives'],
-                         hints_used=session['hints_used'],
-                         max_hints=session['max_hints'])
+                         current_round=game.current_round,
+                         total_rounds=game.total_rounds,
+                         lives=game.lives,
+                         hints_used=game.hints_used,
+                         max_hints=game.max_hints,
+                         scene_sizes=SCENE_IMAGE_SIZES)
+
+@route('/play/state')
+def game_state():
+    """현재 게임 상태 JSON (라운드, 목숨, 힌트, 현재 방)"""
+    game = game_session.load_game()
+    redirect_url = game_redirect(game)
+    if redirect_url:
+        return jsonify({'success': False, 'redirect': redirect_url})
+    
+    quiz = current_room(game)
+    if not quiz:
+        return jsonify({'success': False, 'redirect': url_for('game_start')})
+    
+    state = game_state_payload(game, quiz)
+    return add_scene_preload(jsonify({'success': True, 'state': state}), state['room'])
 
-@app.route('/play/answer', methods=['POST'])
+@route('/play/answer', methods=['POST'])
 def game_answer():
     """답 제출 처리"""
-    if not session.get('game_active'):
+    game = game_session.load_game()
+    if not game or not game.active:
         return jsonify({'success': False, 'message': '게임이 활성화되지 않았습니다.'})
     
+    if game.lives <= 0:
+        # 이미 게임 오버된 판에 늦게 도착한 답 (중복 제출, 동시에 보낸 답 등)
+        return jsonify({
+            'success': True,
+            'correct': False,
+            'message': '남은 목숨이 없습니다.',
+            'lives': 0,
+            'redirect': url_for('game_over')
+        })
+    
     user_answer = request.form.get('answer', '').strip()
-    quiz_id = session.get('current_quiz_id')
+    quiz_id = game.current_quiz_id
     
     if not user_answer:
         return jsonify({'success': False, 'message': '답을 입력해주세요.'})
     
+    # 저장 시 정규화해 둔 정답 키와 메모리에서 비교 (DB 조회 없음)
+    # 오답 메시지의 정답도 여기서 읽어 둔 레코드를 씀 (그 사이 퀴즈가 삭제되어도 다시 조회하지 않음)
     quiz = database.get_quiz_by_id(quiz_id)
-    if not quiz:
+    answer_keys = database.get_answer_keys(quiz_id)
+    if quiz is None or answer_keys is None:
         return jsonify({'success': False, 'message': '퀴즈를 찾을 수 없습니다.'})
     
-    correct_answer = quiz[5]  # 정답
-    
-    # 대소문자 구분 없이 비교 (영어 답변 고려)
-    if user_answer.lower() == correct_answer.lower():
+    # 유니코드 정규화, 대소문자, 공백, 전각/반각 차이는 무시
+    if answer_matcher.is_correct(user_answer, answer_keys, current_app.config['ANSWER_MAX_DISTANCE']):
         # 정답!
-        session['completed_quiz_ids'].append(quiz_id)
-        session['current_round'] += 1
+        game.completed_quiz_ids.append(quiz_id)
+        game.current_round += 1
+        
+        # 다음 방을 미리 뽑아 응답에 담음 (화면을 다시 불러오지 않고 그 자리에서 전환)
+        next_quiz = draw_room(game) if game.current_round <= game.total_rounds else None
+        game_session.save_game(game)
         
-        if session['current_round'] > session['total_rounds']:
+        if game.current_round > game.total_rounds:
             # 게임 클리어
             return jsonify({
                 'success': True, 
@@ -448,24 +770,30 @@ def game_answer():
                 'redirect': url_for('game_clear')
             })
         else:
-            # 다음 라운드로
-            return jsonify({
+            # 다음 라운드로 (redirect 는 next 를 처리하지 않는 화면용)
+            result = {
                 'success': True, 
                 'correct': True,
                 'message': '정답입니다! 다음 방으로 이동합니다...',
                 'redirect': url_for('game_play')
-            })
+            }
+            if not next_quiz:
+                return jsonify(result)
+            
+            result['next'] = game_state_payload(game, next_quiz)
+            return add_scene_preload(jsonify(result), result['next']['room'])
     else:
         # 오답
-        session['lives'] -= 1
+        game.lives = max(0, game.lives - 1)
+        game_session.save_game(game)
         
-        if session['lives'] <= 0:
+        if game.lives <= 0:
             # 게임 오버
             return jsonify({
                 'success': True,
                 'correct': False,
-                'message': f'틀렸습니다. 정답은 "{correct_answer}"입니다.',
-                'lives': session['lives'],
+                'message': f'틀렸습니다. 정답은 "{quiz[5]}"입니다.',
+                'lives': game.lives,
                 'redirect': url_for('game_over')
             })
         else:
@@ -473,46 +801,47 @@ def game_answer():
             return jsonify({
                 'success': True,
                 'correct': False,
-                'message': f'틀렸습니다. 남은 목숨: {session["lives"]}개',
-                'lives': session['lives']
+                'message': f'틀렸습니다. 남은 목숨: {game.lives}개',
+                'lives': game.lives
             })
 
-@app.route('/play/hint', methods=['POST'])
+@route('/play/hint', methods=['POST'])
 def game_hint():
     """힌트 요청 처리"""
-    if not session.get('game_active'):
+    game = game_session.load_game()
+    if not game or not game.active:
         return jsonify({'success': False, 'message': '게임이 활성화되지 않았습니다.'})
     
-    if session['hints_used'] >= session['max_hints']:
+    if game.hints_used >= game.max_hints:
         return jsonify({'success': False, 'message': '더 이상 힌트를 사용할 수 없습니다.'})
     
-    quiz_id = session.get('current_quiz_id')
-    quiz = database.get_quiz_by_id(quiz_id)
+    quiz = database.get_quiz_by_id(game.current_quiz_id)
     
     if not quiz:
         return jsonify({'success': False, 'message': '퀴즈를 찾을 수 없습니다.'})
     
-    session['hints_used'] += 1
+    game.hints_used += 1
+    game_session.save_game(game)
     
     return jsonify({
         'success': True,
         'hint': quiz[4],  # 힌트
-        'hints_used': session['hints_used'],
-        'max_hints': session['max_hints']
+        'hints_used': game.hints_used,
+        'max_hints': game.max_hints
     })
 
-@app.route('/play/clear')
+@route('/play/clear')
 def game_clear():
     """게임 클리어 화면"""
-    if not session.get('game_active'):
+    game = game_session.load_game()
+    if not game or not game.active:
         return redirect(url_for('game_start'))
     
-    total_rounds = session.get('total_rounds', 0)
-    hints_used = session.get('hints_used', 0)
-    start_time = session.get('start_time', 0)
+    total_rounds = game.total_rounds
+    hints_used = game.hints_used
+    start_time = game.start_time
     
     # 완료 시간 계산 (초 단위)
-    import time
     completion_time = int(time.time() - start_time) if start_time else 0
     
     # 점수 계산
@@ -521,12 +850,13 @@ def game_clear():
     time_bonus = max(0, 1000 - completion_time // 60 * 10)  # 시간 보너스 (분당 -10점)
     final_score = max(0, base_score - hint_penalty + time_bonus)
     
-    # 세션에 점수 저장
-    session['final_score'] = final_score
-    session['completion_time'] = completion_time
+    # 게임 상태에 점수 저장
+    game.final_score = final_score
+    game.completion_time = completion_time
     
     # 게임 세션 종료
-    session['game_active'] = False
+    game.active = False
+    game_session.save_game(game)
     
     return render_template('game/clear.html', 
                          total_rounds=total_rounds,
@@ -534,7 +864,7 @@ def game_clear():
                          completion_time=completion_time,
                          final_score=final_score)
 
-@app.route('/leaderboard/register', methods=['POST'])
+@route('/leaderboard/register', methods=['POST'])
 def register_leaderboard():
     """리더보드에 기록 등록"""
     try:
@@ -546,29 +876,46 @@ def register_leaderboard():
         if len(player_name) > 20:
             return jsonify({'success': False, 'message': '이름은 20자 이하로 입력해주세요.'})
         
-        # 세션에서 게임 결과 가져오기
-        total_rounds = session.get('total_rounds', 0)
-        hints_used = session.get('hints_used', 0)
-        completion_time = session.get('completion_time', 0)
-        final_score = session.get('final_score', 0)
-        
-        if total_rounds == 0:
+        # 게임 상태에서 결과 가져오기
+        game = game_session.load_game()
+        if not game or not game.total_rounds:
             return jsonify({'success': False, 'message': '게임 기록이 없습니다.'})
         
-        # 리더보드에 추가
-        entry_id = database.add_leaderboard_entry(
-            player_name, total_rounds, hints_used, completion_time, final_score
-        )
+        total_rounds = game.total_rounds
+        hints_used = game.hints_used
+        completion_time = game.completion_time or 0
+        final_score = game.final_score or 0
         
-        if entry_id:
-            # 등록 완료 후 세션 정리
-            session.pop('final_score', None)
-            session.pop('completion_time', None)
+        entry = (player_name, total_rounds, hints_used, completion_time, final_score)
+        
+        # 지연 기록: 저장은 기록 스레드에 맡기고 예상 순위로 바로 응답 (큐가 가득 차면 직접 저장)
+        entry_id = None
+        queued = (current_app.config['LEADERBOARD_WRITE_BEHIND']
+                  and leaderboard_writer.get_writer().submit(entry))
+        if not queued:
+            entry_id = database.add_leaderboard_entry(*entry)
+        
+        if queued or entry_id:
+            # 등록 완료 후 게임 상태 정리
+            game.final_score = None
+            game.completion_time = None
+            game_session.save_game(game)
+            
+            if queued:
+                # 아직 저장되지 않은 기록이므로 현재 순위 인덱스 기준 예상 순위 (O(log n) 조회)
+                rank_info = database.estimate_leaderboard_rank(final_score, completion_time, hints_used) or {}
+            else:
+                # 전체 기록 중 순위 (O(log n) 조회)
+                rank_info = database.get_leaderboard_rank(entry_id) or {}
             
             return jsonify({
                 'success': True, 
                 'message': f'축하합니다! {player_name}님의 기록이 등록되었습니다!',
-                'entry_id': entry_id
+                'entry_id': entry_id,
+                'pending': bool(queued),
+                'rank': rank_info.get('rank'),
+                'total': rank_info.get('total'),
+                'percentile': rank_info.get('percentile')
             })
         else:
             return jsonify({'success': False, 'message': '기록 등록에 실패했습니다.'})
@@ -576,44 +923,145 @@ def register_leaderboard():
     except Exception as e:
         return jsonify({'success': False, 'message': f'오류가 발생했습니다: {str(e)}'})
 
-@app.route('/leaderboard')
+@route('/leaderboard')
 def leaderboard():
-    """리더보드 페이지"""
-    records = database.get_leaderboard(50)  # 상위 50명
-    total_records = database.get_leaderboard_count()
+    """
+    리더보드 페이지 (기록이 바뀌지 않았으면 캐시된 페이지)
+    ?live=1 이면 관람용 화면으로 leaderboard_live.POLL_INTERVAL 마다 새 기록을 확인해 표를 갱신
+    """
+    live = request.args.get('live') == '1'
+    
+    # 버전을 먼저 읽고 렌더링하므로 캐시된 내용은 항상 키의 버전 이상을 반영
+    def render():
+        records = database.get_leaderboard(50)  # 상위 50명
+        total_records = database.get_leaderboard_count()
+        return render_template('leaderboard.html',
+                             records=records,
+                             total_records=total_records,
+                             live=live,
+                             live_poll_interval=leaderboard_live.POLL_INTERVAL)
     
-    return render_template('leaderboard.html',
-                         records=records,
-                         total_records=total_records)
+    return render_cache.cached_page('leaderboard', (database.get_data_versions('leaderboard'), live), render)
 
-@app.route('/play/over')
+@route('/leaderboard/live')
+def leaderboard_live_data():
+    """관람용 화면의 상위 목록 JSON (기록이 바뀌지 않았으면 If-None-Match 에 304)"""
+    return render_cache.cached_page('leaderboard_live', leaderboard_live.current_version(),
+                                    leaderboard_live.render_payload, mimetype='application/json')
+
+@route('/play/over')
 def game_over():
     """게임 오버 화면"""
-    current_round = session.get('current_round', 1)
-    total_rounds = session.get('total_rounds', 0)
+    game = game_session.load_game()
+    current_round = game.current_round if game else 1
+    total_rounds = game.total_rounds if game else 0
     
     # 게임 세션 종료
-    session['game_active'] = False
+    if game and game.active:
+        game.active = False
+        game_session.save_game(game)
     
     return render_template('game/over.html',
                          current_round=current_round,
                          total_rounds=total_rounds)
 
-if __name__ == '__main__':
-    import os
+def create_app(config=None):
+    """
+    Flask 앱 생성 (config 로 기본 설정을 덮어쓸 수 있음)
+    스키마 준비와 캐시 예열은 warm_up() 에서 따로 합니다.
+    """
+    app = Flask(__name__)
+    app.secret_key = 'your-secret-key-change-this'
+    
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    app.config['MUSIC_FOLDER'] = MUSIC_FOLDER
+    app.config['MAX_CONTENT_LENGTH'] = MAX_TOTAL_UPLOAD_SIZE  # 전체 요청 크기 제한
+    
+    # 게임 상태는 서버 측 저장소에 보관 (쿠키에는 세션 ID만 저장)
+    app.config['GAME_STORE'] = os.environ.get('GAME_STORE', game_session.DEFAULT_STORE)
+    app.config['GAME_STATE_TTL'] = game_session.DEFAULT_TTL
+    
+    # 정답 오타 허용 (한글 자모 기준 편집 거리, 0 이면 정규화된 정답과 정확히 일치해야 함)
+    app.config['ANSWER_MAX_DISTANCE'] = int(os.environ.get('ANSWER_MAX_DISTANCE', 0))
+    
+    # 리더보드 지연 기록 (켜면 등록 요청은 큐에 넣고 바로 예상 순위로 응답, 기록 스레드가 모아서 저장)
+    app.config['LEADERBOARD_WRITE_BEHIND'] = os.environ.get('LEADERBOARD_WRITE_BEHIND', '') == '1'
+    
+    # /admin/metrics 접근 토큰 (없으면 같은 서버(loopback)에서만 조회 가능)
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    
+    # SQL 추적 (지정하면 이 시간(ms) 이상 걸린 SQL 문장을 실행 시간과 함께 출력, 0 이면 모든 문장)
+    app.config['SQL_SLOW_MS'] = os.environ.get('SQL_SLOW_MS')
+    
+    # 컴파일된 템플릿 바이트코드 저장 폴더 (없으면 시스템 임시 폴더)
+    app.config['JINJA_CACHE_DIR'] = os.environ.get('JINJA_CACHE_DIR')
+    
+    app.config['WARMED_UP'] = False  # warm_up() 완료 여부 (/readyz)
+    
+    if config:
+        app.config.update(config)
+    
+    # 템플릿 바이트코드 캐시 (재시작한 프로세스도 템플릿을 다시 컴파일하지 않음)
+    # jinja_env 가 처음 만들어지기 전에 설정해야 적용됨
+    if app.config['JINJA_CACHE_DIR']:
+        os.makedirs(app.config['JINJA_CACHE_DIR'], exist_ok=True)
+    app.jinja_options = {**app.jinja_options,
+                         'bytecode_cache': FileSystemBytecodeCache(app.config['JINJA_CACHE_DIR'])}
+    
+    if app.config['SQL_SLOW_MS']:
+        database.enable_sql_trace(float(app.config['SQL_SLOW_MS']))
+    
+    # 폴더가 없으면 생성
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['MUSIC_FOLDER'], exist_ok=True)
+    
+    # 요청(앱 컨텍스트)이 끝날 때 스레드 연결의 미완료 트랜잭션 정리
+    app.teardown_appcontext(database.release_connection)
+    
+    # 라우트별 처리 시간과 요청당 database 함수 호출 수/시간 수집
+    metrics.instrument_module(database)
+    metrics.init_app(app)
+    
+    app.after_request(add_image_cache_headers)
+    app.add_template_global(scene_srcset)
+    app.add_template_global(scene_thumbnail_url)
+    
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    
+    return app
 
+def warm_up(app):
+    """
+    스키마 준비와 캐시 예열 (운영에서는 gunicorn 마스터가 워커를 fork 하기 전에 한 번 실행)
+    퀴즈 카탈로그, 리더보드 순위 인덱스, 배경음악 목록, 컴파일된 템플릿을 미리 메모리에 올려
+    워커들이 copy-on-write 로 공유하고 첫 요청부터 바로 사용합니다.
+    """
+    started = time.perf_counter()
+    
+    with app.app_context():
+        database.init_database()
+        database.reconcile_stats()  # 배포 사이에 쌓였을 수 있는 집계 차이 보정
+        database.get_all_quizzes()
+        database.get_leaderboard_count()
+        get_music_catalog()
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+    
+    app.config['WARMED_UP'] = True
+    print(f"캐시 예열 완료 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+if __name__ == '__main__':
+    # 개발용 실행 (운영에서는 gunicorn -c gunicorn.conf.py wsgi:app)
+    app = create_app()
+    warm_up(app)
+    
     # Render에서는 환경변수 PORT로 포트를 넘겨줌
     port = int(os.environ.get("PORT", 5000))
-
-    # 배포 시에는 init_database()를 여기서 호출하지 않고,
-    # 별도 스크립트나 첫 요청 시에만 한 번 돌리는 것도 고려.
-
-    # 데이터베이스 초기화
-    database.init_database()
     
     print("🎮 방탈출 퀴즈 관리 시스템이 시작되었습니다!")
-    print("📝 대시보드: http://localhost:5000")
-    print("📋 퀴즈 목록: http://localhost:5000/quiz/list")
-    print("⚙️  관리자 콘솔: http://localhost:5000/admin")
+    print(f"📝 대시보드: http://localhost:{port}")
+    print(f"📋 퀴즈 목록: http://localhost:{port}/quiz/list")
+    print(f"⚙️  관리자 콘솔: http://localhost:{port}/admin")
     
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=port)
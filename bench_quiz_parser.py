@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from quiz_parser import parse_quiz_file
+
+# 퀴즈 파서 벤치마크
+# 입력 크기를 두 배씩 늘려가며 처리 시간과 최대 메모리를 측정합니다.
+# 시간은 입력 크기에 비례(MB/s 가 일정)하고, 파일을 스트리밍하므로 메모리는 거의 일정해야 합니다.
+SIZES_MB = (1, 2, 4, 8)
+
+QUIZ_TEMPLATE = """{number}. 방의 이름: 벤치마크 방 {number}
+방의 배경 묘사
+오래된 시계탑 꼭대기의 작은 방. 벽에는 {number}개의 톱니바퀴가 걸려 있고,
+바닥에는 먼지 쌓인 설계도가 펼쳐져 있다.
+
+창밖으로는 멈춘 시계 바늘이 보인다.
+문제
+설계도에 적힌 숫자들을 모두 더하면 문의 비밀번호가 된다. 숫자는 3, 1, 4, 1, 5 이다. 비밀번호는 무엇인가?
+힌트
+설계도의 숫자를 하나도 빠뜨리지 말고 더해 보라.
+답
+14
+
+"""
+
+def write_sample(path, size_mb):
+    """size_mb 크기 이상의 퀴즈 텍스트 파일 생성 (생성한 퀴즈 수 반환)"""
+    target = size_mb * 1024 * 1024
+    written = 0
+    number = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            number += 1
+            chunk = QUIZ_TEMPLATE.format(number=number)
+            f.write(chunk)
+            written += len(chunk.encode('utf-8'))
+    return number
+
+def measure(path):
+    """파일 전체 파싱 시간(초), 퀴즈 수, 최대 메모리(바이트)"""
+    started = time.perf_counter()
+    count = sum(1 for block in parse_quiz_file(path) if block.quiz)
+    elapsed = time.perf_counter() - started
+
+    # tracemalloc 은 실행을 느리게 하므로 메모리는 따로 한 번 더 측정
+    tracemalloc.start()
+    for _ in parse_quiz_file(path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, count, peak
+
+def run(sizes=SIZES_MB):
+    print(f"{'크기':>6} {'퀴즈 수':>8} {'시간(초)':>9} {'MB/s':>7} {'퀴즈당(µs)':>11} {'최대 메모리':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in sizes:
+            path = os.path.join(tmp_dir, f'quizzes_{size_mb}mb.txt')
+            expected = write_sample(path, size_mb)
+            elapsed, count, peak = measure(path)
+
+            if count != expected:
+                print(f"파싱 결과가 다릅니다: {count}개 (예상 {expected}개)")
+                sys.exit(1)
+
+            print(f"{size_mb:>4}MB {count:>8} {elapsed:>9.3f} {size_mb / elapsed:>7.1f} "
+                  f"{elapsed / count * 1e6:>11.1f} {peak / 1024:>9.0f}KB")
+
+if __name__ == "__main__":
+    # 사용법: python bench_quiz_parser.py [크기(MB) ...]
+    run(tuple(int(arg) for arg in sys.argv[1:]) or SIZES_MB)
@@ -0,0 +1,160 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import database
+
+# 쿼리 실행 계획 점검
+# 게임 진행, 관리자 목록, 리더보드, 게임 세션에서 자주 호출되는 database 함수들을
+# DB 복사본에서 실제로 실행하며 set_trace_callback 으로 실행된 문장(바인딩 값 포함)을 모으고,
+# 각 문장을 EXPLAIN QUERY PLAN 으로 확인합니다.
+# 인덱스 없이 테이블 전체를 읽거나(SCAN 테이블) 임시 B-tree 로 정렬하면(USE TEMP B-TREE) 실패합니다.
+#
+# 사용법:
+#   python check_query_plans.py              (database.DATABASE_NAME 복사본에서 점검)
+#   python check_query_plans.py --db 경로 -v  (모든 문장의 실행 계획 출력)
+CHECKED_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+SAMPLE_QUIZ = ('점검용 방', '실행 계획 점검을 위한 방', '문제', '힌트', '정답')
+
+def plan_problems(plan_details):
+    """실행 계획에서 전체 스캔/임시 정렬 단계 목록"""
+    problems = []
+    for detail in plan_details:
+        if 'USE TEMP B-TREE' in detail:
+            problems.append(detail)
+        elif (detail.startswith('SCAN ') and ' USING ' not in detail
+              and 'VIRTUAL TABLE' not in detail and detail != 'SCAN CONSTANT ROW'):
+            problems.append(detail)
+    return problems
+
+def exercise_hot_paths(record):
+    """자주 호출되는 database 함수 실행 (record(이름) 으로 이후 문장이 어느 호출인지 표시)"""
+    now = time.time()
+
+    record('add_quiz')
+    quiz_id = database.add_quiz(*SAMPLE_QUIZ)
+
+    record('get_all_quizzes')
+    database.invalidate_catalog()
+    database.get_all_quizzes()
+    database.get_quiz_by_id(quiz_id)
+    database.get_answer_keys(quiz_id)
+
+    record('update_quiz')
+    database.update_quiz(quiz_id, *SAMPLE_QUIZ)
+
+    record('update_quiz_image')
+    database.update_quiz_image(quiz_id, None)
+    database.update_quiz_images({quiz_id: None})
+
+    record('get_quiz_count')
+    database.get_quiz_count()
+    database.reconcile_stats_if_due()  # 방금 보정했으므로 reconciled_at 조회만 실행됨
+
+    record('quizzes_without_images')
+    database.count_quizzes_without_images()
+    database.get_quizzes_without_images()
+
+    for image_filter in ('all', 'no-image', 'has-image'):
+        for sort in database.QUIZ_PAGE_SORTS:
+            record(f'get_quiz_page({image_filter}, {sort})')
+            rows, next_key = database.get_quiz_page(None, 1, image_filter, sort)
+            database.get_quiz_page(next_key or ('2000-01-01 00:00:00', 0), 20, image_filter, sort, '방')
+
+    record('search_quizzes')
+    database.search_quizzes('점검용', image_filter='no-image')
+    database.search_quizzes('실행 계획 점검')
+
+    record('get_data_versions')
+    database.get_data_versions('quizzes', 'leaderboard')
+
+    record('get_next_prev_quiz_ids')
+    database.get_next_prev_quiz_ids(quiz_id)
+
+    record('add_leaderboard_entry')
+    entry_id = database.add_leaderboard_entry('점검', 20, 0, 600, 1000)
+
+    record('get_leaderboard')
+    database.get_leaderboard()
+    database.get_leaderboard(limit=1_000_000)  # 메모리 상위 목록을 넘는 요청은 SQL 로 조회
+    database.get_leaderboard_rank(entry_id)
+
+    record('game_session')
+    database.save_game_session('check-query-plans', b'state', now + 60)
+    database.load_game_session('check-query-plans', now)
+    database.count_game_sessions(now)
+    database.delete_game_session('check-query-plans')
+    database.delete_expired_game_sessions(now)
+
+    record('delete_quiz')
+    database.delete_quiz(quiz_id)
+
+def collect_statements():
+    """hot path 실행 중 실행된 (호출 이름, 문장) 목록 (같은 문장은 한 번만)"""
+    conn = database.get_connection()
+    statements = []
+    seen = set()
+    label = ['']
+
+    def trace(statement):
+        if statement.lstrip().upper().startswith(CHECKED_STATEMENTS) and statement not in seen:
+            seen.add(statement)
+            statements.append((label[0], statement))
+
+    def record(name):
+        label[0] = name
+
+    conn.set_trace_callback(trace)
+    try:
+        exercise_hot_paths(record)
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+def check(verbose=False):
+    """수집한 문장들의 실행 계획 점검 (문제 있는 문장 수 반환)"""
+    conn = database.get_connection()
+    failures = 0
+
+    for label, statement in collect_statements():
+        details = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + statement)]
+        problems = plan_problems(details)
+        if problems:
+            failures += 1
+        if problems or verbose:
+            print(f"{'실패' if problems else '통과'} [{label}] {' '.join(statement.split())}")
+            for detail in details:
+                print(f"    {'!' if detail in problems else ' '} {detail}")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='자주 쓰는 쿼리의 실행 계획 점검')
+    parser.add_argument('--db', help='점검할 DB 파일 (기본값: database.DATABASE_NAME, 복사본에서 실행)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='통과한 문장의 실행 계획도 출력')
+    args = parser.parse_args(argv)
+
+    source = args.db or database.DATABASE_NAME
+    with tempfile.TemporaryDirectory(prefix='query_plans_') as tmp_dir:
+        db_path = os.path.join(tmp_dir, os.path.basename(source))
+        if os.path.exists(source):
+            shutil.copy(source, db_path)
+        database.DATABASE_NAME = db_path
+        database.init_database()  # 점검 대상은 init_database() 가 만드는 스키마와 인덱스
+        database.reconcile_stats()  # 전체 COUNT 로 다시 세는 보정은 hot path 가 아니므로 미리 실행
+        try:
+            failures = check(args.verbose)
+        finally:
+            database.close_connection()
+
+    if failures:
+        print(f"전체 스캔 또는 임시 정렬을 하는 문장이 {failures}개 있습니다.")
+        return 1
+    print("모든 문장이 인덱스를 사용합니다.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,216 @@
 import sqlite3
 import os
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime
 
+import answer_matcher
+from leaderboard_index import LeaderboardIndex
+
 DATABASE_NAME = 'escape_room_quizzes.db'
 
+# 퀴즈 카탈로그 캐시 설정
+# 게임 중에는 퀴즈가 거의 바뀌지 않으므로 메모리에 올려두고,
+# 다른 워커의 변경은 quizzes 트리거가 올리는 data_versions 값으로 확인합니다.
+# (PRAGMA data_version 과 달리 연결과 무관한 값이라 fork 한 워커도 물려받은 캐시를 그대로 검증 가능)
+CATALOG_CHECK_INTERVAL = 0.5  # 버전 재확인 간격 (초)
+VERSIONED_TABLES = ('quizzes', 'leaderboard')  # data_versions 로 변경을 추적하는 테이블 (렌더링 캐시 키에도 사용)
+
+QUIZ_COLUMNS = ('id', 'room_name', 'background_description', 'question',
+                'hint', 'answer', 'image_path', 'created_at',
+                'answer_aliases', 'answer_normalized')
+
+# 불변 퀴즈 레코드 (기존 튜플 인덱스 quiz[0]~quiz[7] 그대로 사용 가능, 별칭은 quiz[8])
+QuizRecord = namedtuple('QuizRecord', QUIZ_COLUMNS)
+
+class _QuizCatalog:
+    """메모리에 올려둔 퀴즈 목록 스냅샷"""
+    __slots__ = ('ordered', 'by_id', 'ids', 'answer_keys', 'data_version', 'checked_at')
+
+    def __init__(self, ordered, data_version):
+        self.ordered = ordered
+        self.by_id = {quiz.id: quiz for quiz in ordered}
+        self.ids = tuple(sorted(self.by_id))
+        # 정답 해시 인덱스: 퀴즈 ID -> 정규화된 정답/별칭 키 집합 (저장 시 계산된 값 사용)
+        self.answer_keys = {quiz.id: answer_matcher.decode_keys(quiz.answer_normalized) for quiz in ordered}
+        self.data_version = data_version
+        self.checked_at = time.monotonic()
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+# 리더보드 순위 인덱스 (다른 워커가 추가한 기록은 id 증가분만 따라 읽음)
+_leaderboard_index = None
+_leaderboard_index_path = None
+_leaderboard_lock = threading.Lock()
+
+# SQLite 연결 설정
+# WAL 모드에서는 읽기가 쓰기를 막지 않으며, synchronous=NORMAL 로도
+# 체크포인트 시점까지의 커밋 내구성이 보장됩니다.
+SQLITE_JOURNAL_MODE = 'WAL'
+SQLITE_SYNCHRONOUS = 'NORMAL'
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024  # 64MB
+SQLITE_CACHED_STATEMENTS = 256  # 연결별 prepared statement 캐시 크기
+
+# 스레드별로 재사용하는 연결 (요청이 끝나도 닫지 않고 다음 요청에서 다시 사용)
+_local = threading.local()
+
+# SQL 추적 (기본 꺼짐, enable_sql_trace() 이후 새로 여는 연결부터 적용)
+# set_trace_callback 으로 실제 실행된 문장(바인딩 값, 암묵적 BEGIN/COMMIT 포함)을 받아
+# 실행 시간이 SQL_SLOW_MS 이상인 것만 출력합니다. 0 이면 모든 문장을 출력합니다.
+SQL_SLOW_MS = None
+SQL_TRACE_MAX_LENGTH = 500  # 출력할 문장 최대 길이 (BLOB 바인딩 값이 길 수 있음)
+
+def _report_statements(statements, elapsed):
+    if SQL_SLOW_MS is None or elapsed * 1000 < SQL_SLOW_MS:
+        return
+    text = '; '.join(' '.join(statement.split()) for statement in statements)
+    if len(text) > SQL_TRACE_MAX_LENGTH:
+        text = text[:SQL_TRACE_MAX_LENGTH] + '...'
+    print(f"[SQL {elapsed * 1000:.1f}ms] {text}")
+
+class _TracedCursor(sqlite3.Cursor):
+    """
+    실행 시간을 재는 커서 (SQL 추적 모드 전용)
+    결과가 있는 문장은 첫 fetch 까지의 시간을 합쳐서 출력합니다.
+    """
+    _pending = None  # (문장 목록, 지금까지 걸린 시간)
+
+    def _timed(self, method, *args):
+        self._pending = None
+        trace = self.connection.trace_buffer
+        trace.clear()
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            statements = list(trace) or [args[0]]
+            if self.description is None:
+                _report_statements(statements, elapsed)
+            else:
+                self._pending = (statements, elapsed)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._pending is not None:
+                statements, elapsed = self._pending
+                self._pending = None
+                _report_statements(statements, elapsed + time.perf_counter() - started)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(super().executescript, sql_script)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+class _TracedConnection(sqlite3.Connection):
+    """모든 문장을 _TracedCursor 로 실행하고 COMMIT 시간도 재는 연결"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.trace_buffer = []
+        self.set_trace_callback(self.trace_buffer.append)
+
+    def cursor(self, factory=_TracedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute 는 cursor() 를 거치지 않으므로 직접 연결
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        self.trace_buffer.clear()
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            # 열린 트랜잭션이 없으면 아무 문장도 실행되지 않음
+            if self.trace_buffer:
+                _report_statements(list(self.trace_buffer), time.perf_counter() - started)
+
+def enable_sql_trace(slow_ms=0):
+    """SQL 추적 켜기 (slow_ms 이상 걸린 문장 출력, None 이면 끄기)"""
+    global SQL_SLOW_MS
+    SQL_SLOW_MS = slow_ms
+    # 현재 스레드 연결은 다시 열어 설정을 반영
+    close_connection()
+
+def _connect(**kwargs):
+    """튜닝된 PRAGMA 가 적용된 새 SQLite 연결 생성"""
+    if SQL_SLOW_MS is not None:
+        kwargs.setdefault('factory', _TracedConnection)
+    conn = sqlite3.connect(DATABASE_NAME,
+                           timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=SQLITE_CACHED_STATEMENTS,
+                           **kwargs)
+    conn.execute(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+    conn.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA mmap_size = {SQLITE_MMAP_SIZE}')
+    return conn
+
+def get_connection():
+    """현재 스레드의 데이터베이스 연결 반환 (없으면 새로 생성)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.path == DATABASE_NAME:
+        return conn
+    
+    if conn is not None:
+        conn.close()
+    conn = _connect()
+    _local.conn = conn
+    _local.path = DATABASE_NAME
+    return conn
+
+def release_connection(exception=None):
+    """
+    요청 종료 시 호출 (Flask teardown_appcontext)
+    연결은 스레드에 남겨 재사용하고, 끝나지 않은 트랜잭션만 롤백합니다.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+def close_connection(exception=None):
+    """현재 스레드의 연결 닫기"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
+
 def init_database():
-    """데이터베이스 초기화 및 테이블 생성"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    """
+    데이터베이스 초기화 및 테이블 생성 (스키마 준비는 모두 여기서 한 번에)
+    이미 준비된 DB 에서는 바뀌는 것이 없으므로, 운영에서는 warm_up() 이 워커를 fork 하기 전에 한 번 실행하고
+    요청 처리 중에는 스키마를 확인하지 않습니다. (스크립트도 DB 를 쓰기 전에 먼저 호출)
+    """
+    global _quiz_search_fts
+    
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -35,6 +239,28 @@ def init_database():
         )
     ''')
     
+    # 목록 정렬 및 이전/다음 탐색용 인덱스 (생성일이 같으면 id 로 순서 고정)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_quizzes_created_at_id ON quizzes(created_at, id)')
+    
+    # 이미지가 없는 퀴즈만 담는 부분 인덱스 (이미지 없음 필터 목록/개수를 전체 스캔 없이 조회)
+    # 조회 쿼리의 WHERE 절이 인덱스 조건과 글자 그대로 같아야 사용됨
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_quizzes_missing_image
+        ON quizzes(created_at, id) WHERE {MISSING_IMAGE_CONDITION}
+    ''')
+    
+    # 리더보드 정렬 순서 그대로의 커버링 인덱스 (정렬 없이 상위 기록 조회)
+    # 동점 순서(id)가 표시 컬럼보다 앞에 있어야 임시 정렬이 생기지 않음
+    cursor.execute('DROP INDEX IF EXISTS idx_leaderboard_rank')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_leaderboard_order
+        ON leaderboard(score DESC, completion_time ASC, hints_used ASC, id ASC,
+                       player_name, total_rounds, completed_at)
+    ''')
+    
+    # 서버 측 게임 세션 테이블 생성
+    _create_game_sessions_table(cursor)
+    
     # 기존 테이블에 image_path 컬럼이 없다면 추가
     cursor.execute("PRAGMA table_info(quizzes)")
     columns = [column[1] for column in cursor.fetchall()]
@@ -42,95 +268,223 @@ def init_database():
         cursor.execute('ALTER TABLE quizzes ADD COLUMN image_path TEXT')
         print("이미지 경로 필드가 추가되었습니다.")
     
+    _create_data_versions(cursor)
+    _migrate_answer_columns(cursor)
+    _quiz_search_fts = _create_quiz_search(cursor)
+    _create_stats(cursor)
+    
     conn.commit()
-    conn.close()
     print("데이터베이스가 초기화되었습니다.")
 
-def add_quiz(room_name, background_description, question, hint, answer, image_path=None):
+def _create_data_versions(cursor):
+    """테이블별 변경 버전(data_versions)과 이를 올리는 트리거 생성"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
+def _migrate_answer_columns(cursor):
+    """정답 별칭(answer_aliases)과 정규화 키(answer_normalized) 컬럼 추가 및 기존 퀴즈 채우기"""
+    cursor.execute("PRAGMA table_info(quizzes)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'answer_aliases' not in columns:
+        cursor.execute('ALTER TABLE quizzes ADD COLUMN answer_aliases TEXT')
+    if 'answer_normalized' not in columns:
+        cursor.execute('ALTER TABLE quizzes ADD COLUMN answer_normalized TEXT')
+    
+    cursor.execute('SELECT id, answer, answer_aliases FROM quizzes WHERE answer_normalized IS NULL')
+    rows = cursor.fetchall()
+    if rows:
+        cursor.executemany('UPDATE quizzes SET answer_normalized = ? WHERE id = ?',
+                           [(_normalized_answer(row[1], row[2]), row[0]) for row in rows])
+        print(f"{len(rows)}개 퀴즈의 정답 정규화 키를 생성했습니다.")
+
+def _normalized_answer(answer, answer_aliases):
+    """answer_normalized 컬럼에 저장할 값"""
+    return answer_matcher.encode_keys(answer_matcher.answer_keys(answer, answer_aliases))
+
+def add_quiz(room_name, background_description, question, hint, answer, image_path=None, answer_aliases=None):
     """퀴즈를 데이터베이스에 추가"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
-        INSERT INTO quizzes (room_name, background_description, question, hint, answer, image_path)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (room_name, background_description, question, hint, answer, image_path))
+        INSERT INTO quizzes (room_name, background_description, question, hint, answer, image_path,
+                             answer_aliases, answer_normalized)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (room_name, background_description, question, hint, answer, image_path,
+          answer_aliases, _normalized_answer(answer, answer_aliases)))
     
     quiz_id = cursor.lastrowid
     conn.commit()
-    conn.close()
+    invalidate_catalog()
     return quiz_id
 
-def get_all_quizzes():
-    """모든 퀴즈 조회"""
-    conn = sqlite3.connect(DATABASE_NAME)
+def add_quizzes_bulk(quizzes):
+    """
+    여러 퀴즈를 한 트랜잭션으로 추가 (executemany)
+    quizzes 는 room_name, background_description, question, hint, answer (선택: answer_aliases, image_path)
+    키를 가진 딕셔너리 목록이며
+    추가된 퀴즈 ID 목록을 순서대로 반환합니다. 중간에 실패하면 하나도 추가되지 않습니다.
+    """
+    if not quizzes:
+        return []
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # 쓰기 잠금을 먼저 잡아 다른 연결의 추가가 끼어들지 않도록 함 (ID가 연속으로 배정됨)
+        cursor.execute('BEGIN IMMEDIATE')
+        if _quiz_search_fts:
+            # 행마다 검색 색인을 갱신하는 트리거는 잠시 지우고, 추가가 끝나면 새 ID 범위를 한 번에 색인
+            # (같은 트랜잭션 안이라 다른 연결은 트리거가 없는 상태를 볼 수 없고, 실패하면 함께 되돌려짐)
+            cursor.execute('DROP TRIGGER IF EXISTS trg_quizzes_fts_insert')
+        cursor.executemany('''
+            INSERT INTO quizzes (room_name, background_description, question, hint, answer, image_path,
+                                 answer_aliases, answer_normalized)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(quiz['room_name'], quiz['background_description'], quiz['question'],
+               quiz['hint'], quiz['answer'], quiz.get('image_path'), quiz.get('answer_aliases'),
+               _normalized_answer(quiz['answer'], quiz.get('answer_aliases'))) for quiz in quizzes])
+        
+        last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+        if _quiz_search_fts:
+            _index_quizzes_range(cursor, last_id - len(quizzes) + 1, last_id)
+            _create_quiz_search_insert_trigger(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    invalidate_catalog()
+    return list(range(last_id - len(quizzes) + 1, last_id + 1))
+
+def _read_data_version():
+    """퀴즈 카탈로그 버전 조회 (_catalog_lock 안에서 호출)"""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT version FROM data_versions WHERE name = 'quizzes'")
+    return cursor.fetchone()[0]
+
+def get_data_versions(*names):
+    """테이블별 변경 버전 튜플 (names 순서대로, 렌더링 캐시 키용)"""
+    cursor = get_connection().cursor()
+    cursor.execute(f"SELECT name, version FROM data_versions WHERE name IN ({', '.join('?' * len(names))})", names)
+    versions = dict(cursor.fetchall())
+    return tuple(versions[name] for name in names)
+
+def _load_catalog_rows():
+    """카탈로그 캐시를 채우기 위해 전체 퀴즈를 읽음"""
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
-        SELECT id, room_name, background_description, question, hint, answer, image_path, created_at
-        FROM quizzes ORDER BY created_at DESC
+        SELECT id, room_name, background_description, question, hint, answer, image_path, created_at,
+               answer_aliases, answer_normalized
+        FROM quizzes ORDER BY created_at DESC, id DESC
     ''')
     
-    quizzes = cursor.fetchall()
-    conn.close()
+    quizzes = tuple(QuizRecord._make(row) for row in cursor.fetchall())
     return quizzes
 
-def get_quiz_by_id(quiz_id):
-    """ID로 특정 퀴즈 조회"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
+def _get_catalog():
+    """퀴즈 카탈로그 캐시 반환 (필요할 때만 다시 읽음)"""
+    global _catalog
     
-    cursor.execute('''
-        SELECT id, room_name, background_description, question, hint, answer, image_path, created_at
-        FROM quizzes WHERE id = ?
-    ''', (quiz_id,))
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - catalog.checked_at < CATALOG_CHECK_INTERVAL:
+        return catalog
     
-    quiz = cursor.fetchone()
-    conn.close()
-    return quiz
+    with _catalog_lock:
+        # 읽기 전에 버전을 먼저 확인해야 읽는 도중의 변경을 놓치지 않음
+        data_version = _read_data_version()
+        catalog = _catalog
+        if catalog is not None and catalog.data_version == data_version:
+            catalog.checked_at = time.monotonic()
+        else:
+            catalog = _QuizCatalog(_load_catalog_rows(), data_version)
+            _catalog = catalog
+        return catalog
+
+def invalidate_catalog():
+    """퀴즈 카탈로그 캐시 무효화 (퀴즈 변경 후 호출)"""
+    global _catalog
+    _catalog = None
+
+def get_catalog_version():
+    """퀴즈 카탈로그 캐시가 반영한 data_versions 값 (이후의 카탈로그 조회는 이 버전 이상을 반영)"""
+    return _get_catalog().data_version
+
+def get_all_quizzes():
+    """모든 퀴즈 조회"""
+    return list(_get_catalog().ordered)
+
+def get_quiz_by_id(quiz_id):
+    """ID로 특정 퀴즈 조회"""
+    return _get_catalog().by_id.get(quiz_id)
+
+def get_answer_keys(quiz_id):
+    """퀴즈의 정규화된 정답/별칭 키 집합 (메모리 조회, 퀴즈가 없으면 None)"""
+    return _get_catalog().answer_keys.get(quiz_id)
+
+def get_quiz_ids():
+    """전체 퀴즈 ID 튜플 조회 (ID 오름차순)"""
+    return _get_catalog().ids
 
 def delete_quiz(quiz_id):
     """퀴즈 삭제"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('DELETE FROM quizzes WHERE id = ?', (quiz_id,))
     deleted_count = cursor.rowcount
     
     conn.commit()
-    conn.close()
+    invalidate_catalog()
     return deleted_count > 0
 
 def get_quiz_count():
-    """전체 퀴즈 개수 조회"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT COUNT(*) FROM quizzes')
-    count = cursor.fetchone()[0]
-    
-    conn.close()
-    return count
+    """전체 퀴즈 개수 조회 (트리거로 유지되는 집계 값)"""
+    return get_stats()['quizzes']
 
-def update_quiz(quiz_id, room_name, background_description, question, hint, answer, image_path=None):
-    """퀴즈 수정"""
-    conn = sqlite3.connect(DATABASE_NAME)
+def update_quiz(quiz_id, room_name, background_description, question, hint, answer, image_path=None,
+                answer_aliases=None):
+    """퀴즈 수정 (answer_aliases 가 None 이면 기존 별칭 유지)"""
+    if answer_aliases is None:
+        quiz = get_quiz_by_id(quiz_id)
+        answer_aliases = quiz[8] if quiz else None
+    
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
         UPDATE quizzes 
-        SET room_name = ?, background_description = ?, question = ?, hint = ?, answer = ?, image_path = ?
+        SET room_name = ?, background_description = ?, question = ?, hint = ?, answer = ?, image_path = ?,
+            answer_aliases = ?, answer_normalized = ?
         WHERE id = ?
-    ''', (room_name, background_description, question, hint, answer, image_path, quiz_id))
+    ''', (room_name, background_description, question, hint, answer, image_path,
+          answer_aliases, _normalized_answer(answer, answer_aliases), quiz_id))
     
     updated_count = cursor.rowcount
     conn.commit()
-    conn.close()
+    invalidate_catalog()
     return updated_count > 0
 
 def update_quiz_image(quiz_id, image_path):
     """퀴즈의 이미지 경로만 업데이트"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -141,90 +495,541 @@ def update_quiz_image(quiz_id, image_path):
     
     updated_count = cursor.rowcount
     conn.commit()
-    conn.close()
+    invalidate_catalog()
     return updated_count > 0
 
+def update_quiz_images(image_paths):
+    """
+    여러 퀴즈의 이미지 경로를 한 트랜잭션으로 업데이트
+    image_paths 는 {퀴즈 ID: 이미지 파일명} 이며, 실제로 업데이트된 퀴즈 ID 집합을 반환합니다.
+    """
+    if not image_paths:
+        return set()
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    updated = set()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        for quiz_id, image_path in image_paths.items():
+            cursor.execute('UPDATE quizzes SET image_path = ? WHERE id = ?', (image_path, quiz_id))
+            if cursor.rowcount:
+                updated.add(quiz_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    invalidate_catalog()
+    return updated
+
+# 이미지 없음 조건 (idx_quizzes_missing_image 부분 인덱스 조건과 같은 문자열을 사용해야 인덱스를 탐)
+MISSING_IMAGE_CONDITION = "(image_path IS NULL OR image_path = '')"
+
 def get_quizzes_without_images():
-    """이미지가 없는 퀴즈들 조회"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    """이미지가 없는 퀴즈들 조회 (등록 순)"""
+    conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute('''
+    cursor.execute(f'''
         SELECT id, room_name, background_description
         FROM quizzes 
-        WHERE image_path IS NULL OR image_path = ''
-        ORDER BY id
+        WHERE {MISSING_IMAGE_CONDITION}
+        ORDER BY created_at, id
     ''')
     
     quizzes = cursor.fetchall()
-    conn.close()
     return quizzes
 
-def get_next_prev_quiz_ids(current_quiz_id):
-    """현재 퀴즈의 다음/이전 퀴즈 ID 조회"""
-    conn = sqlite3.connect(DATABASE_NAME)
+def get_image_paths():
+    """퀴즈들이 참조하는 이미지 파일명 집합"""
+    return {quiz[6] for quiz in _get_catalog().ordered if quiz[6]}
+
+def count_quizzes_without_images():
+    """이미지가 없는 퀴즈 수 조회 (트리거로 유지되는 집계 값)"""
+    return get_stats()['quizzes_without_image']
+
+# 대시보드/관리자 화면용 집계 (stats 테이블)
+# 트리거가 쓰기와 같은 트랜잭션에서 값을 올리고 내리므로 조회는 기본 키 검색 한 번이면 됩니다.
+# 트리거가 생기기 전의 데이터나 외부 도구로 고친 행 때문에 생긴 차이는
+# reconcile_stats() 가 COUNT 로 다시 세어 바로잡습니다.
+# 보정은 쓰기 잠금과 전체 COUNT 가 필요하므로 요청 처리 중에는 하지 않고, warm_up() 과
+# 워커의 게임 세션 정리 스레드(reconcile_stats_if_due)에서만 실행합니다. get_stats() 는 읽기만 합니다.
+STATS_RECONCILE_INTERVAL = 60 * 60  # 집계 보정 주기 (초, 워커들이 reconciled_at 값을 공유)
+
+# 집계 이름 -> 다시 셀 때 쓰는 쿼리
+STAT_QUERIES = {
+    'quizzes': 'SELECT COUNT(*) FROM quizzes',
+    'quizzes_without_image': f'SELECT COUNT(*) FROM quizzes WHERE {MISSING_IMAGE_CONDITION}',
+    'leaderboard_entries': 'SELECT COUNT(*) FROM leaderboard',
+    # 저장된 세션 수 (정리 스레드가 지우기 전의 만료 세션 포함, 진행 중인 게임 수는 count_game_sessions())
+    'game_sessions': 'SELECT COUNT(*) FROM game_sessions',
+}
+
+def _missing_image(row):
+    """트리거 안에서 new/old 행의 이미지 없음 여부 (0 또는 1)"""
+    return f"({row}.image_path IS NULL OR {row}.image_path = '')"
+
+def _create_stats(cursor):
+    """
+    집계 테이블과 이를 유지하는 트리거 생성
+    처음 만들 때는 reconciled_at 이 0 이므로 warm_up() 의 reconcile_stats() 에서 실제 개수로 채워집니다.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany('INSERT OR IGNORE INTO stats (name, value) VALUES (?, 0)',
+                       [(name,) for name in (*STAT_QUERIES, 'reconciled_at')])
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_stats_insert AFTER INSERT ON quizzes
+        BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'quizzes';
+            UPDATE stats SET value = value + {_missing_image('new')} WHERE name = 'quizzes_without_image';
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_stats_delete AFTER DELETE ON quizzes
+        BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'quizzes';
+            UPDATE stats SET value = value - {_missing_image('old')} WHERE name = 'quizzes_without_image';
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_stats_image AFTER UPDATE OF image_path ON quizzes
+        WHEN {_missing_image('old')} != {_missing_image('new')}
+        BEGIN
+            UPDATE stats SET value = value + {_missing_image('new')} - {_missing_image('old')}
+            WHERE name = 'quizzes_without_image';
+        END
+    ''')
+    # 게임 세션 저장은 대부분 ON CONFLICT DO UPDATE 라 INSERT 트리거는 새 세션에서만 실행됨
+    for table, name in (('leaderboard', 'leaderboard_entries'), ('game_sessions', 'game_sessions')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE stats SET value = value + 1 WHERE name = '{name}';
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE stats SET value = value - 1 WHERE name = '{name}';
+            END
+        ''')
+
+def reconcile_stats():
+    """집계를 실제 개수로 다시 세어 보정 (차이가 있던 항목 딕셔너리 반환)"""
+    conn = get_connection()
     cursor = conn.cursor()
     
-    # 모든 퀴즈 ID를 생성일 순으로 정렬하여 가져오기
-    cursor.execute('SELECT id FROM quizzes ORDER BY created_at DESC')
-    quiz_ids = [row[0] for row in cursor.fetchall()]
+    drift = {}
+    try:
+        # 세는 동안 다른 연결의 쓰기가 끼어들면 트리거 값과 어긋나므로 쓰기 잠금을 먼저 잡음
+        cursor.execute('BEGIN IMMEDIATE')
+        for name, query in STAT_QUERIES.items():
+            actual = cursor.execute(query).fetchone()[0]
+            stored = cursor.execute('SELECT value FROM stats WHERE name = ?', (name,)).fetchone()[0]
+            if actual != stored:
+                drift[name] = (stored, actual)
+                cursor.execute('UPDATE stats SET value = ? WHERE name = ?', (actual, name))
+        cursor.execute("UPDATE stats SET value = ? WHERE name = 'reconciled_at'", (int(time.time()),))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    for name, (stored, actual) in drift.items():
+        print(f"집계 보정: {name} {stored} -> {actual}")
+    return drift
+
+def get_stats():
+    """집계 딕셔너리 (quizzes, quizzes_without_image, leaderboard_entries, game_sessions)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    names = tuple(STAT_QUERIES)
+    query = f"SELECT name, value FROM stats WHERE name IN ({', '.join('?' * len(names))})"
+    return dict(cursor.execute(query, names).fetchall())
+
+def reconcile_stats_if_due(interval=STATS_RECONCILE_INTERVAL):
+    """마지막 보정(모든 워커 공유)으로부터 interval 이 지났으면 reconcile_stats() 실행 (실행했으면 True)"""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT value FROM stats WHERE name = 'reconciled_at'")
+    if time.time() - cursor.fetchone()[0] < interval:
+        return False
     
-    conn.close()
+    reconcile_stats()
+    return True
+
+# 관리자 목록 정렬 방식: (ORDER BY 절, keyset 비교 연산자)
+QUIZ_PAGE_SORTS = {
+    'newest': ('created_at DESC, id DESC', '<'),
+    'oldest': ('created_at ASC, id ASC', '>'),
+}
+
+def get_quiz_page(cursor_key=None, limit=20, image_filter='all', sort='newest', search=None):
+    """
+    관리자 목록용 퀴즈 페이지 조회 (keyset 페이지네이션)
+    cursor_key 는 이전 페이지 마지막 항목의 (created_at, id) 이며,
+    목록 카드에 필요한 컬럼만 읽습니다.
+    반환값: (퀴즈 목록, 다음 페이지 cursor_key 또는 None)
+    """
+    order_by, operator = QUIZ_PAGE_SORTS[sort]
+    conditions = []
+    params = []
+    
+    if cursor_key is not None:
+        conditions.append(f'(created_at, id) {operator} (?, ?)')
+        params.extend(cursor_key)
+    
+    if image_filter == 'no-image':
+        conditions.append(MISSING_IMAGE_CONDITION)
+    elif image_filter == 'has-image':
+        conditions.append("image_path IS NOT NULL AND image_path != ''")
+    
+    if search:
+        conditions.append("room_name LIKE '%' || ? || '%'")
+        params.append(search)
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # 다음 페이지가 있는지 알기 위해 하나 더 읽음
+    cursor.execute(f'''
+        SELECT id, room_name, image_path, created_at, substr(question, 1, 120)
+        FROM quizzes {where}
+        ORDER BY {order_by}
+        LIMIT ?
+    ''', (*params, limit + 1))
+    
+    rows = cursor.fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last[3], last[0])
+    return rows, None
+
+def get_next_prev_quiz_ids(current_quiz_id):
+    """현재 퀴즈의 다음/이전 퀴즈 ID 조회"""
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    if current_quiz_id not in quiz_ids:
+    # 생성일이 같은 퀴즈도 순서가 정해지도록 (created_at, id) 기준으로 비교
+    # idx_quizzes_created_at_id 인덱스를 타므로 퀴즈 수와 관계없이 O(log n)
+    cursor.execute('SELECT created_at FROM quizzes WHERE id = ?', (current_quiz_id,))
+    row = cursor.fetchone()
+    if not row:
         return None, None
     
-    current_index = quiz_ids.index(current_quiz_id)
+    created_at = row[0]
     
-    # 이전 퀴즈 (인덱스가 더 작은 것, 즉 더 최근 것)
-    prev_quiz_id = quiz_ids[current_index - 1] if current_index > 0 else None
+    # 이전 퀴즈 (목록에서 바로 위, 즉 더 최근 것)
+    cursor.execute('''
+        SELECT id FROM quizzes
+        WHERE (created_at, id) > (?, ?)
+        ORDER BY created_at ASC, id ASC
+        LIMIT 1
+    ''', (created_at, current_quiz_id))
+    row = cursor.fetchone()
+    prev_quiz_id = row[0] if row else None
     
-    # 다음 퀴즈 (인덱스가 더 큰 것, 즉 더 오래된 것)
-    next_quiz_id = quiz_ids[current_index + 1] if current_index < len(quiz_ids) - 1 else None
+    # 다음 퀴즈 (목록에서 바로 아래, 즉 더 오래된 것)
+    cursor.execute('''
+        SELECT id FROM quizzes
+        WHERE (created_at, id) < (?, ?)
+        ORDER BY created_at DESC, id DESC
+        LIMIT 1
+    ''', (created_at, current_quiz_id))
+    row = cursor.fetchone()
+    next_quiz_id = row[0] if row else None
     
     return prev_quiz_id, next_quiz_id
 
+# 퀴즈 전문 검색
+# quizzes_fts 는 quizzes 를 원본으로 하는 FTS5 외부 콘텐츠 테이블이며 트리거로 동기화합니다 (대량 추가는 끝난 뒤 한 번에 색인).
+# trigram 토크나이저는 띄어쓰기나 조사와 관계없이 3글자 이상의 부분 문자열을 찾으므로 한국어에도 맞습니다.
+# 3글자보다 짧은 검색어가 있거나 SQLite 가 FTS5 trigram 을 지원하지 않으면 LIKE 로 찾습니다.
+QUIZ_SEARCH_COLUMNS = ('room_name', 'background_description', 'question', 'hint', 'answer')
+QUIZ_SEARCH_WEIGHTS = (10.0, 2.0, 4.0, 1.0, 5.0)  # bm25 컬럼 가중치 (방 이름 > 정답 > 문제 > 배경 > 힌트)
+FTS_MIN_TERM_LENGTH = 3  # trigram 으로 찾을 수 있는 최소 검색어 길이
+SNIPPET_TOKENS = 24  # 발췌 길이 (trigram 토큰 = 글자 수)
+
+# 검색 결과에서 일치한 부분을 감싸는 표시 문자 (HTML 변환은 호출하는 쪽에서)
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_ELLIPSIS = '…'
+
+_quiz_search_fts = False  # FTS5 trigram 사용 가능 여부 (init_database() 에서 설정)
+
+def _create_quiz_search(cursor):
+    """
+    퀴즈 검색용 FTS5 테이블과 동기화 트리거 생성 (처음 만들 때 기존 퀴즈로 색인)
+    FTS5 trigram 을 사용할 수 있으면 True
+    """
+    columns = ', '.join(QUIZ_SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in QUIZ_SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in QUIZ_SEARCH_COLUMNS)
+    
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quizzes_fts'")
+    exists = cursor.fetchone() is not None
+    
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS quizzes_fts USING fts5(
+                {columns}, content='quizzes', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"FTS5 trigram 을 사용할 수 없어 LIKE 검색을 사용합니다: {e}")
+        return False
+    
+    weights = ', '.join(str(weight) for weight in QUIZ_SEARCH_WEIGHTS)
+    cursor.execute(f"INSERT INTO quizzes_fts (quizzes_fts, rank) VALUES ('rank', 'bm25({weights})')")
+    
+    _create_quiz_search_insert_trigger(cursor)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_fts_delete AFTER DELETE ON quizzes
+        BEGIN
+            INSERT INTO quizzes_fts (quizzes_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    # 이미지 경로 변경처럼 검색 컬럼이 바뀌지 않는 수정은 색인을 건드리지 않음
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_fts_update AFTER UPDATE OF {columns} ON quizzes
+        BEGIN
+            INSERT INTO quizzes_fts (quizzes_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO quizzes_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    
+    if not exists:
+        cursor.execute("INSERT INTO quizzes_fts (quizzes_fts) VALUES ('rebuild')")
+        print("퀴즈 검색 색인을 만들었습니다.")
+    return True
+
+def _create_quiz_search_insert_trigger(cursor):
+    """퀴즈 추가 시 검색 색인에 넣는 트리거 (대량 추가 중에는 잠시 지웠다가 다시 만듦)"""
+    columns = ', '.join(QUIZ_SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in QUIZ_SEARCH_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_quizzes_fts_insert AFTER INSERT ON quizzes
+        BEGIN
+            INSERT INTO quizzes_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+
+def _index_quizzes_range(cursor, first_id, last_id):
+    """ID 범위의 퀴즈를 검색 색인에 한 번에 추가"""
+    columns = ', '.join(QUIZ_SEARCH_COLUMNS)
+    cursor.execute(f'''
+        INSERT INTO quizzes_fts (rowid, {columns})
+        SELECT id, {columns} FROM quizzes WHERE id BETWEEN ? AND ?
+    ''', (first_id, last_id))
+
+def _search_terms(query):
+    """검색어를 공백으로 나눈 목록 (중복 제거)"""
+    terms = []
+    for term in query.split():
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+def _fts_match_expression(terms):
+    """FTS5 MATCH 식 (각 검색어를 구문으로 감싸 특수 문자도 그대로 검색, 모두 포함해야 일치)"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+def _mark_terms(text, terms):
+    """text 에서 검색어와 일치하는 부분을 강조 표시 문자로 감쌈 (대소문자 무시)"""
+    lowered = text.lower()
+    spans = []
+    for term in terms:
+        term = term.lower()
+        start = lowered.find(term)
+        while start != -1:
+            spans.append((start, start + len(term)))
+            start = lowered.find(term, start + len(term))
+    
+    marked = []
+    position = 0
+    for start, end in sorted(spans):
+        if start < position:
+            continue  # 겹치는 일치는 앞의 것만 표시
+        marked.append(text[position:start])
+        marked.append(HIGHLIGHT_START + text[start:end] + HIGHLIGHT_END)
+        position = end
+    marked.append(text[position:])
+    return ''.join(marked)
+
+def _like_snippet(values, terms):
+    """첫 검색어가 처음 나오는 컬럼에서 앞뒤를 잘라낸 발췌 (LIKE 검색용)"""
+    first = terms[0].lower()
+    for value in values:
+        start = (value or '').lower().find(first)
+        if start == -1:
+            continue
+        begin = max(0, start - SNIPPET_TOKENS // 2)
+        end = min(len(value), begin + SNIPPET_TOKENS)
+        snippet = _mark_terms(value[begin:end], terms)
+        return (SNIPPET_ELLIPSIS if begin > 0 else '') + snippet + (SNIPPET_ELLIPSIS if end < len(value) else '')
+    return ''
+
+def search_quizzes(query, limit=20, offset=0, image_filter='all'):
+    """
+    퀴즈 전문 검색 (FTS5 는 관련도 순, LIKE 검색은 최신순)
+    각 행은 (id, room_name, image_path, created_at, 문제 미리보기, 강조된 방 이름, 강조된 발췌) 입니다.
+    반환값: (퀴즈 목록, 다음 페이지 offset 또는 None)
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return [], None
+    
+    conditions = []
+    if image_filter == 'no-image':
+        conditions.append(MISSING_IMAGE_CONDITION)
+    elif image_filter == 'has-image':
+        conditions.append("image_path IS NOT NULL AND image_path != ''")
+    
+    # trigram 색인으로 찾을 수 있는 검색어는 MATCH 로, 짧은 검색어는 그 결과 안에서 LIKE 로 거름
+    fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH] if _quiz_search_fts else []
+    params = []
+    for term in terms:
+        if term in fts_terms:
+            continue
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        conditions.append('(' + ' OR '.join(f"q.{column} LIKE ? ESCAPE '\\'"
+                                            for column in QUIZ_SEARCH_COLUMNS) + ')')
+        params.extend([pattern] * len(QUIZ_SEARCH_COLUMNS))
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    if fts_terms:
+        where = ''.join(f' AND {condition}' for condition in conditions)
+        # ORDER BY rank 는 FTS5 가 색인 안에서 처리하므로 임시 정렬이 없음
+        cursor.execute(f'''
+            SELECT q.id, q.room_name, q.image_path, q.created_at, substr(q.question, 1, 120),
+                   highlight(quizzes_fts, 0, ?, ?),
+                   snippet(quizzes_fts, -1, ?, ?, ?, ?)
+            FROM quizzes_fts
+            JOIN quizzes q ON q.id = quizzes_fts.rowid
+            WHERE quizzes_fts MATCH ?{where}
+            ORDER BY rank
+            LIMIT ? OFFSET ?
+        ''', (HIGHLIGHT_START, HIGHLIGHT_END, HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_ELLIPSIS,
+              SNIPPET_TOKENS, _fts_match_expression(fts_terms), *params, limit + 1, offset))
+        rows = cursor.fetchall()
+        if len(fts_terms) < len(terms):
+            # 짧은 검색어는 FTS 가 강조하지 않으므로 방 이름 강조를 다시 계산
+            rows = [(*row[:5], _mark_terms(row[1], terms), row[6]) for row in rows]
+    else:
+        # 모든 검색어가 짧으면 trigram 색인을 쓸 수 없으므로 최신순으로 훑으며 LIKE 로 확인
+        cursor.execute(f'''
+            SELECT q.id, q.room_name, q.image_path, q.created_at, substr(q.question, 1, 120),
+                   {', '.join('q.' + column for column in QUIZ_SEARCH_COLUMNS)}
+            FROM quizzes q
+            WHERE {' AND '.join(conditions)}
+            ORDER BY q.created_at DESC, q.id DESC
+            LIMIT ? OFFSET ?
+        ''', (*params, limit + 1, offset))
+        rows = [(*row[:5], _mark_terms(row[1], terms), _like_snippet(row[5:], terms))
+                for row in cursor.fetchall()]
+    
+    if len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
+
 def clear_all_quizzes():
     """모든 퀴즈 삭제 (개발용)"""
-    conn = sqlite3.connect(DATABASE_NAME)
+    conn = get_connection()
     cursor = conn.cursor()
     
     cursor.execute('DELETE FROM quizzes')
     conn.commit()
-    conn.close()
+    invalidate_catalog()
     print("모든 퀴즈가 삭제되었습니다.")
 
 def add_leaderboard_entry(player_name, total_rounds, hints_used, completion_time, score=0):
     """리더보드에 새 기록 추가"""
+    entry_ids = add_leaderboard_entries([(player_name, total_rounds, hints_used, completion_time, score)])
+    return entry_ids[0] if entry_ids else None
+
+def add_leaderboard_entries(entries):
+    """
+    여러 리더보드 기록을 한 트랜잭션으로 추가 (leaderboard_writer 의 일괄 기록용)
+    entries 는 (player_name, total_rounds, hints_used, completion_time, score) 목록이며,
+    추가된 기록 ID 목록을 같은 순서로 반환합니다. (실패하면 None)
+    """
+    conn = get_connection()
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
         cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
         
-        cursor.execute('''
-            INSERT INTO leaderboard (player_name, total_rounds, hints_used, completion_time, score)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (player_name, total_rounds, hints_used, completion_time, score))
+        entry_ids = []
+        for entry in entries:
+            cursor.execute('''
+                INSERT INTO leaderboard (player_name, total_rounds, hints_used, completion_time, score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', entry)
+            entry_ids.append(cursor.lastrowid)
         
-        entry_id = cursor.lastrowid
         conn.commit()
-        return entry_id
     except sqlite3.Error as e:
+        conn.rollback()
         print(f"리더보드 추가 오류: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
+    
+    # 커밋된 기록은 인덱스 반영이 실패해도 저장된 것이므로 ID 를 반환
+    # (실패하면 다음 조회 때 last_id 이후 기록을 다시 읽어 반영)
+    try:
+        _sync_leaderboard_index()
+    except sqlite3.Error as e:
+        print(f"리더보드 인덱스 갱신 오류: {e}")
+    return entry_ids
+
+def _sync_leaderboard_index():
+    """리더보드 인덱스에 아직 반영되지 않은 기록을 읽어서 추가"""
+    global _leaderboard_index, _leaderboard_index_path
+    
+    with _leaderboard_lock:
+        if _leaderboard_index is None or _leaderboard_index_path != DATABASE_NAME:
+            _leaderboard_index = LeaderboardIndex()
+            _leaderboard_index_path = DATABASE_NAME
+        index = _leaderboard_index
+        
+        # 쓰기는 SQLite 에서 직렬화되므로 커밋 순서와 id 순서가 같아 누락이 없음
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, player_name, total_rounds, hints_used, completion_time, score, completed_at
+            FROM leaderboard WHERE id > ? ORDER BY id
+        ''', (index.last_id,))
+        
+        for row in cursor.fetchall():
+            index.add(row[0], row[1:])
+        return index
 
 def get_leaderboard(limit=20):
     """리더보드 조회 (상위 기록들)"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
+        records = _sync_leaderboard_index().top(limit)
+        if records is not None:
+            return records
+        
+        # 메모리에 유지하는 상위 목록보다 많이 요청하면 인덱스로 직접 조회
+        conn = get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT player_name, total_rounds, hints_used, completion_time, score, completed_at
             FROM leaderboard 
-            ORDER BY score DESC, completion_time ASC, hints_used ASC
+            ORDER BY score DESC, completion_time ASC, hints_used ASC, id ASC
             LIMIT ?
         ''', (limit,))
         
@@ -233,25 +1038,102 @@ def get_leaderboard(limit=20):
     except sqlite3.Error as e:
         print(f"리더보드 조회 오류: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def get_leaderboard_count():
     """리더보드 총 기록 수"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM leaderboard')
-        count = cursor.fetchone()[0]
-        return count
+        return _sync_leaderboard_index().total
     except sqlite3.Error as e:
         print(f"리더보드 카운트 오류: {e}")
         return 0
-    finally:
-        if conn:
-            conn.close()
+
+def estimate_leaderboard_rank(score, completion_time, hints_used):
+    """아직 기록되지 않은 결과의 예상 순위와 백분위 (쓰기 대기 중인 다른 기록은 반영되지 않음)"""
+    try:
+        index = _sync_leaderboard_index()
+        rank = index.rank(score, completion_time, hints_used)
+        total = index.total + 1
+        return {
+            'rank': rank,
+            'total': total,
+            'percentile': index.percentile(rank, total)
+        }
+    except sqlite3.Error as e:
+        print(f"리더보드 순위 조회 오류: {e}")
+        return None
+
+def get_leaderboard_rank(entry_id):
+    """기록의 순위와 백분위 조회 (없으면 None)"""
+    try:
+        index = _sync_leaderboard_index()
+        rank = index.rank_of(entry_id)
+        if rank is None:
+            return None
+        return {
+            'rank': rank,
+            'total': index.total,
+            'percentile': index.percentile(rank)
+        }
+    except sqlite3.Error as e:
+        print(f"리더보드 순위 조회 오류: {e}")
+        return None
+
+def _create_game_sessions_table(cursor):
+    """게임 세션 테이블 생성 (game_session.SQLiteGameStore 용)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_sessions (
+            sid TEXT PRIMARY KEY,
+            state BLOB NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_game_sessions_expires_at ON game_sessions(expires_at)')
+
+def load_game_session(sid, now):
+    """만료되지 않은 게임 세션 상태 조회"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT state FROM game_sessions WHERE sid = ? AND expires_at > ?', (sid, now))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def save_game_session(sid, state, expires_at):
+    """게임 세션 상태 저장 (없으면 추가, 있으면 교체)"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        INSERT INTO game_sessions (sid, state, expires_at) VALUES (?, ?, ?)
+        ON CONFLICT(sid) DO UPDATE SET state = excluded.state, expires_at = excluded.expires_at
+    ''', (sid, state, expires_at))
+    conn.commit()
+
+def delete_game_session(sid):
+    """게임 세션 삭제"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('DELETE FROM game_sessions WHERE sid = ?', (sid,))
+    conn.commit()
+
+def delete_expired_game_sessions(now):
+    """만료된 게임 세션 일괄 삭제"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('DELETE FROM game_sessions WHERE expires_at <= ?', (now,))
+    removed_count = cursor.rowcount
+    conn.commit()
+    return removed_count
+
+def count_game_sessions(now):
+    """만료되지 않은 게임 세션 수"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT COUNT(*) FROM game_sessions WHERE expires_at > ?', (now,))
+    return cursor.fetchone()[0]
 
 if __name__ == "__main__":
     init_database() 
\ No newline at end of file
@@ -0,0 +1,77 @@
+import random
+from bisect import bisect_left
+
+# 게임 방 선택용 셔플 덱
+# 세션에는 (시드, 커서, 덱 크기)만 저장하고, 커서 번째 카드는
+# 시드로 정해지는 순열에서 O(1)로 바로 계산합니다.
+# 덱은 목록 위치가 아니라 퀴즈 ID 범위(1..덱 크기)를 섞은 것이라, 게임 중에 퀴즈가 추가/삭제되어
+# 목록 위치가 바뀌어도 이미 뽑은 방이 다시 나오지 않습니다.
+FEISTEL_ROUNDS = 4
+
+def new_deck_seed():
+    """새 덱 시드 생성"""
+    return random.getrandbits(32)
+
+def _mix(seed, round_no, value):
+    """Feistel 라운드 함수 (32비트 정수 해시)"""
+    x = (seed * 0x9E3779B1 + round_no * 0x85EBCA77 + value) & 0xFFFFFFFF
+    x ^= x >> 16
+    x = (x * 0x7FEB352D) & 0xFFFFFFFF
+    x ^= x >> 15
+    x = (x * 0x846CA68B) & 0xFFFFFFFF
+    x ^= x >> 16
+    return x
+
+def deck_index(seed, cursor, size):
+    """
+    시드로 섞인 0..size-1 순열에서 cursor 번째 값을 반환
+    Feistel 네트워크로 2의 거듭제곱 범위를 섞고, 범위를 벗어나면
+    다시 섞는 cycle walking 으로 size 안의 순열을 만듭니다.
+    """
+    if not 0 <= cursor < size:
+        raise ValueError('cursor 가 덱 범위를 벗어났습니다.')
+    
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    mask = (1 << half_bits) - 1
+    value = cursor
+    
+    while True:
+        left, right = value >> half_bits, value & mask
+        for round_no in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ (_mix(seed, round_no, right) & mask)
+        value = (left << half_bits) | right
+        if value < size:
+            return value
+
+def _contains(sorted_ids, quiz_id):
+    """오름차순 ID 튜플에 quiz_id 가 있는지 (O(log n))"""
+    index = bisect_left(sorted_ids, quiz_id)
+    return index < len(sorted_ids) and sorted_ids[index] == quiz_id
+
+def draw(deck, quiz_ids):
+    """
+    덱에서 다음 퀴즈 ID를 뽑음
+    quiz_ids 는 현재 퀴즈 ID 오름차순 튜플, deck 은 {'seed', 'cursor', 'size'} 딕셔너리이며 새 상태를 함께 반환합니다.
+    size 는 섞을 때의 가장 큰 ID 로, 1..size 를 섞은 순열에서 삭제된 ID 는 건너뛰고
+    섞은 뒤 추가된 ID(size 보다 큰 ID)는 순열 뒤에 ID 순으로 이어집니다.
+    덱을 다 돌면 새로 섞어서 처음부터 다시 시작합니다.
+    (건너뛰는 횟수는 평균 가장 큰 ID / 퀴즈 수 이므로 ID 가 대부분 비어 있지 않으면 O(1))
+    """
+    if not quiz_ids:
+        return None, deck
+    
+    max_id = quiz_ids[-1]
+    if deck:
+        seed, cursor, size = deck['seed'], deck['cursor'], deck['size']
+    else:
+        seed, cursor, size = new_deck_seed(), 0, max_id
+    
+    while True:
+        if cursor >= max(size, max_id):
+            # 덱을 다 돌았으면 현재 ID 범위로 새로 섞음 (max_id 가 있으므로 한 바퀴 안에 반드시 뽑힘)
+            seed, cursor, size = new_deck_seed(), 0, max_id
+        
+        quiz_id = deck_index(seed, cursor, size) + 1 if cursor < size else cursor + 1
+        cursor += 1
+        if _contains(quiz_ids, quiz_id):
+            return quiz_id, {'seed': seed, 'cursor': cursor, 'size': size}
@@ -0,0 +1,241 @@
+import os
+import secrets
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from flask import current_app, session
+
+import database
+
+# 서버 측 게임 세션 저장소
+# 쿠키에는 불투명한 세션 ID 하나만 두고, 게임 상태는 압축된 바이트로
+# 서버(SQLite 또는 메모리)에 보관합니다.
+SESSION_KEY = 'game_sid'
+DEFAULT_STORE = 'sqlite'  # 'sqlite' 또는 'memory' (memory 는 단일 워커 전용)
+DEFAULT_TTL = 2 * 60 * 60  # 마지막으로 저장된 뒤 2시간이 지나면 만료
+DEFAULT_SWEEP_INTERVAL = 5 * 60  # 만료 세션 정리 주기 (초)
+
+class GameState:
+    """한 판의 게임 상태 (바이트로 직렬화해서 저장)"""
+
+    # 플래그, 라운드, 총 라운드, 목숨, 사용 힌트, 최대 힌트, 현재 퀴즈 ID, 시작 시간,
+    # 덱 시드/커서/크기, 최종 점수, 완료 시간 (None 은 -1 로 저장)
+    # 목숨은 0 아래로 내려가도 직렬화가 실패하지 않도록 부호 있는 값으로 저장 (같은 크기라 기존 상태와 호환)
+    _HEADER = struct.Struct('<BHHbBBIdIIIii')
+
+    __slots__ = ('active', 'current_round', 'total_rounds', 'lives', 'hints_used',
+                 'max_hints', 'current_quiz_id', 'start_time', 'deck_seed',
+                 'deck_cursor', 'deck_size', 'final_score', 'completion_time',
+                 'completed_quiz_ids')
+
+    def __init__(self, total_rounds, lives=3, max_hints=5, start_time=None):
+        self.active = True
+        self.current_round = 1
+        self.total_rounds = total_rounds
+        self.lives = lives
+        self.hints_used = 0
+        self.max_hints = max_hints
+        self.current_quiz_id = None
+        self.start_time = time.time() if start_time is None else start_time
+        self.deck_seed = 0
+        self.deck_cursor = 0
+        self.deck_size = 0
+        self.final_score = None
+        self.completion_time = None
+        self.completed_quiz_ids = array('I')  # 완료한 퀴즈 ID들
+
+    @property
+    def deck(self):
+        """game_deck.draw() 에 넘길 덱 상태"""
+        if not self.deck_size:
+            return None
+        return {'seed': self.deck_seed, 'cursor': self.deck_cursor, 'size': self.deck_size}
+
+    @deck.setter
+    def deck(self, deck):
+        self.deck_seed = deck['seed'] if deck else 0
+        self.deck_cursor = deck['cursor'] if deck else 0
+        self.deck_size = deck['size'] if deck else 0
+
+    def to_bytes(self):
+        """저장용 바이트로 직렬화"""
+        header = self._HEADER.pack(
+            1 if self.active else 0,
+            self.current_round, self.total_rounds, self.lives,
+            self.hints_used, self.max_hints,
+            self.current_quiz_id or 0, self.start_time,
+            self.deck_seed, self.deck_cursor, self.deck_size,
+            -1 if self.final_score is None else self.final_score,
+            -1 if self.completion_time is None else self.completion_time)
+        return header + self.completed_quiz_ids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """to_bytes() 결과로부터 복원"""
+        (flags, current_round, total_rounds, lives, hints_used, max_hints,
+         current_quiz_id, start_time, deck_seed, deck_cursor, deck_size,
+         final_score, completion_time) = cls._HEADER.unpack_from(data)
+
+        state = cls(total_rounds, lives, max_hints, start_time)
+        state.active = bool(flags & 1)
+        state.current_round = current_round
+        state.hints_used = hints_used
+        state.current_quiz_id = current_quiz_id or None
+        state.deck_seed = deck_seed
+        state.deck_cursor = deck_cursor
+        state.deck_size = deck_size
+        state.final_score = None if final_score < 0 else final_score
+        state.completion_time = None if completion_time < 0 else completion_time
+        state.completed_quiz_ids.frombytes(data[cls._HEADER.size:])
+        return state
+
+class MemoryGameStore:
+    """프로세스 메모리 저장소 (만료 순서대로 정렬된 OrderedDict)"""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._items = OrderedDict()  # sid -> (data, expires_at), 오래된 것부터
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        now = time.time()
+        with self._lock:
+            item = self._items.get(sid)
+            if item is None:
+                return None
+            if item[1] <= now:
+                del self._items[sid]
+                return None
+            # 접근할 때마다 만료 시간 연장 (맨 뒤로 이동해서 정렬 유지)
+            self._items[sid] = (item[0], now + self.ttl)
+            self._items.move_to_end(sid)
+            return item[0]
+
+    def save(self, sid, data):
+        with self._lock:
+            self._items[sid] = (data, time.time() + self.ttl)
+            self._items.move_to_end(sid)
+
+    def delete(self, sid):
+        with self._lock:
+            self._items.pop(sid, None)
+
+    def sweep(self):
+        """만료된 세션 삭제 (앞에서부터 만료되지 않은 항목을 만날 때까지만 확인)"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._items:
+                sid, (data, expires_at) = next(iter(self._items.items()))
+                if expires_at > now:
+                    break
+                del self._items[sid]
+                removed += 1
+        return removed
+
+    def count(self):
+        with self._lock:
+            return len(self._items)
+
+class SQLiteGameStore:
+    """SQLite game_sessions 테이블 저장소 (여러 워커가 공유)"""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+
+    def load(self, sid):
+        # 만료 시간은 save() 때만 연장해서 조회가 쓰기를 일으키지 않도록 함
+        return database.load_game_session(sid, time.time())
+
+    def save(self, sid, data):
+        database.save_game_session(sid, data, time.time() + self.ttl)
+
+    def delete(self, sid):
+        database.delete_game_session(sid)
+
+    def sweep(self):
+        return database.delete_expired_game_sessions(time.time())
+
+    def count(self):
+        # expires_at 인덱스 범위 조회 (정리 스레드가 아직 지우지 않은 만료 세션은 제외)
+        return database.count_game_sessions(time.time())
+
+STORE_BACKENDS = {
+    'sqlite': SQLiteGameStore,
+    'memory': MemoryGameStore,
+}
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+def _sweep_loop(store, interval):
+    """만료 세션 정리 스레드 본체 (요청 처리 중에 하지 않는 집계 보정도 여기서 주기적으로 실행)"""
+    while True:
+        time.sleep(interval)
+        try:
+            store.sweep()
+        except Exception as e:
+            print(f"게임 세션 정리 오류: {e}")
+        
+        try:
+            database.reconcile_stats_if_due()
+        except Exception as e:
+            print(f"집계 보정 오류: {e}")
+        finally:
+            database.close_connection()
+
+def get_store():
+    """현재 프로세스의 게임 세션 저장소 반환 (처음 호출 시 생성 및 정리 스레드 시작)"""
+    global _store, _store_pid
+
+    # fork 된 워커에서는 스레드가 복사되지 않으므로 프로세스별로 새로 만듦
+    if _store is not None and _store_pid == os.getpid():
+        return _store
+
+    with _store_lock:
+        if _store is None or _store_pid != os.getpid():
+            config = current_app.config
+            backend = STORE_BACKENDS[config.get('GAME_STORE', DEFAULT_STORE)]
+            store = backend(ttl=config.get('GAME_STATE_TTL', DEFAULT_TTL))
+
+            sweeper = threading.Thread(
+                target=_sweep_loop,
+                args=(store, config.get('GAME_SWEEP_INTERVAL', DEFAULT_SWEEP_INTERVAL)),
+                name='game-session-sweeper', daemon=True)
+            sweeper.start()
+
+            _store, _store_pid = store, os.getpid()
+        return _store
+
+def load_game():
+    """현재 사용자 세션의 게임 상태 조회 (없으면 None)"""
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        return None
+
+    data = get_store().load(sid)
+    return GameState.from_bytes(data) if data else None
+
+def save_game(state):
+    """게임 상태 저장"""
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        sid = secrets.token_urlsafe(16)
+        session[SESSION_KEY] = sid
+    get_store().save(sid, state.to_bytes())
+
+def start_game(state):
+    """새 게임 시작 - 이전 게임 상태를 버리고 새 세션 ID로 저장"""
+    old_sid = session.get(SESSION_KEY)
+    if old_sid:
+        get_store().delete(old_sid)
+    session[SESSION_KEY] = secrets.token_urlsafe(16)
+    save_game(state)
+
+def active_game_count():
+    """만료되지 않은 게임 세션 수"""
+    return get_store().count()
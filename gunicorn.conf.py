@@ -0,0 +1,32 @@
+import gc
+import os
+
+import database
+import leaderboard_writer
+
+# gunicorn 설정 (사용법: gunicorn -c gunicorn.conf.py wsgi:app)
+# 마스터가 앱 생성, 스키마 준비, 캐시 예열을 한 번만 하고(preload_app) 워커를 fork 합니다.
+# 워커는 예열된 퀴즈 카탈로그/리더보드 인덱스/템플릿을 copy-on-write 로 공유해 첫 요청부터 바로 응답합니다.
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# 스레드 예산: 워커당 GUNICORN_THREADS 개의 요청 스레드를 모든 요청이 나눠 씀
+# 오래 붙잡고 있는 연결은 없음 (/leaderboard?live=1 관람용 화면도 leaderboard_live.POLL_INTERVAL 마다
+# /leaderboard/live 를 짧게 요청하고, 기록이 그대로면 본문 없는 304 로 끝남)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+# 예열 중 생긴 객체가 GC 로 흩어지지 않도록 마스터에서는 GC 를 끄고,
+# fork 직전에 freeze 해서 워커의 GC 가 공유 페이지를 건드려 복사되지 않게 함
+gc.disable()
+
+def pre_fork(server, worker):
+    # SQLite 연결은 fork 로 넘겨 쓰면 안 되므로 마스터가 예열에 쓴 연결을 닫음 (워커는 새로 연결)
+    database.close_connection()
+    gc.freeze()
+
+def post_fork(server, worker):
+    gc.enable()
+
+def worker_exit(server, worker):
+    # 지연 기록 큐에 남은 리더보드 기록을 저장한 뒤 종료
+    leaderboard_writer.shutdown()
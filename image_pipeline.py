@@ -0,0 +1,403 @@
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import database
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 가 없으면 원본 이미지만 사용
+    Image = None
+
+# 장면 이미지 파생본 설정
+# 업로드 시 관리자 목록용 썸네일과 게임 화면용 WebP 를 여러 너비로 만들어
+# static/images/derived/ 에 저장합니다.
+DERIVED_DIR = 'derived'
+THUMBNAIL_WIDTH = 240
+SCENE_WIDTHS = (480, 768, 1024)  # 원본보다 큰 너비는 만들지 않음
+WEBP_QUALITY = 80
+THUMBNAIL_QUALITY = 70
+MISSING_CACHE_TTL = 60  # 파생본이 없다는 결과는 다른 워커의 생성을 반영하도록 잠깐만 캐시
+
+# 내용 해시 파일명 설정
+# quiz_{id}_{해시 16자리}.{확장자} 형식이라 같은 URL 의 내용이 바뀌지 않으므로
+# 브라우저가 영구 캐시해도 됩니다.
+HASH_LENGTH = 16
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60  # 1년
+ORPHAN_GRACE_PERIOD = 60 * 60  # 교체된 이미지는 1시간 뒤에 정리 (열려 있는 게임 화면 보호)
+HASHED_NAME_RE = re.compile(rf'^quiz_\d+_[0-9a-f]{{{HASH_LENGTH}}}(?:_thumb|_\d+w)?\.[a-z0-9]+$')
+MANAGED_NAME_RE = re.compile(r'^quiz_\d+_')  # 정리 대상이 되는 업로드 이미지 이름
+
+# 수동 이미지 일괄 등록 설정 (update_manual_images.py, /admin/quiz/images/bulk-upload)
+# quiz_{ID}_manual.png 처럼 퀴즈 ID 가 들어간 파일들을 작업 스레드에서 검사/저장/파생본 생성한 뒤
+# 바뀐 이미지 경로만 한 트랜잭션으로 반영합니다.
+# 같은 파일을 다시 등록하면 해시 파일명이 같으므로 DB 를 건드리지 않습니다.
+MANUAL_NAME_RE = re.compile(r'^quiz_(\d+)(?:_manual)?\.[A-Za-z0-9]+$')
+INGEST_WORKERS = min(4, os.cpu_count() or 1)
+IMAGE_SIGNATURES = ((b'\x89PNG\r\n\x1a\n', 'png'), (b'\xff\xd8\xff', 'jpg'),
+                    (b'GIF87a', 'gif'), (b'GIF89a', 'gif'))
+PIL_FORMATS = {'PNG': 'png', 'JPEG': 'jpg', 'GIF': 'gif', 'WEBP': 'webp'}  # 저장할 확장자
+
+_derivative_cache = {}  # 원본 파일명 -> (파생본 정보, 만료 시각 또는 None)
+_cache_lock = threading.Lock()
+
+def is_available():
+    """Pillow 설치 여부 (없으면 파생본을 만들지 않음)"""
+    return Image is not None
+
+def _stem(filename):
+    return os.path.splitext(filename)[0]
+
+def thumbnail_name(filename):
+    """썸네일 파생본 경로 (upload_folder 기준 상대 경로)"""
+    return f'{DERIVED_DIR}/{_stem(filename)}_thumb.webp'
+
+def scene_name(filename, width):
+    """게임 화면용 파생본 경로 (upload_folder 기준 상대 경로)"""
+    return f'{DERIVED_DIR}/{_stem(filename)}_{width}w.webp'
+
+def _save_resized(image, width, path, quality):
+    """너비에 맞춰 비율을 유지하며 줄인 WebP 저장 (임시 파일로 쓴 뒤 교체)"""
+    height = max(1, round(image.height * width / image.width))
+    resized = image if image.width == width else image.resize((width, height), Image.LANCZOS)
+
+    tmp_path = f'{path}.tmp'
+    resized.save(tmp_path, 'WEBP', quality=quality, method=4)
+    os.replace(tmp_path, path)
+
+def generate_derivatives(filename, upload_folder):
+    """
+    원본 이미지로부터 썸네일과 여러 너비의 WebP 파생본 생성
+    생성한 파생본 경로 목록을 반환합니다. (Pillow 가 없으면 빈 목록)
+    """
+    if not is_available():
+        return []
+
+    os.makedirs(os.path.join(upload_folder, DERIVED_DIR), exist_ok=True)
+    created = []
+
+    with Image.open(os.path.join(upload_folder, filename)) as source:
+        source.load()
+        image = source.convert('RGBA' if 'A' in source.getbands() else 'RGB')
+
+    _save_resized(image, min(THUMBNAIL_WIDTH, image.width),
+                  os.path.join(upload_folder, thumbnail_name(filename)), THUMBNAIL_QUALITY)
+    created.append(thumbnail_name(filename))
+
+    # 원본보다 큰 너비는 만들지 않음 (확대하면 용량만 늘어남)
+    for width in SCENE_WIDTHS:
+        if width > image.width:
+            break
+        _save_resized(image, width, os.path.join(upload_folder, scene_name(filename, width)), WEBP_QUALITY)
+        created.append(scene_name(filename, width))
+
+    forget(filename)
+    return created
+
+def delete_derivatives(filename, upload_folder):
+    """원본 이미지의 파생본 삭제"""
+    names = [thumbnail_name(filename)] + [scene_name(filename, width) for width in SCENE_WIDTHS]
+    for name in names:
+        path = os.path.join(upload_folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+    forget(filename)
+
+def forget(filename):
+    """파생본 존재 여부 캐시에서 제거"""
+    with _cache_lock:
+        _derivative_cache.pop(filename, None)
+
+def get_derivatives(filename, upload_folder):
+    """
+    원본 이미지의 파생본 정보 조회 (디스크 확인 결과를 캐시)
+    반환값: {'thumbnail': 경로 또는 None, 'srcset': [(경로, 너비), ...]}
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _derivative_cache.get(filename)
+    if cached and (cached[1] is None or cached[1] > now):
+        return cached[0]
+
+    thumbnail = thumbnail_name(filename)
+    info = {
+        'thumbnail': thumbnail if os.path.exists(os.path.join(upload_folder, thumbnail)) else None,
+        'srcset': [(scene_name(filename, width), width) for width in SCENE_WIDTHS
+                   if os.path.exists(os.path.join(upload_folder, scene_name(filename, width)))]
+    }
+
+    expires_at = None if info['thumbnail'] and info['srcset'] else now + MISSING_CACHE_TTL
+    with _cache_lock:
+        _derivative_cache[filename] = (info, expires_at)
+    return info
+
+def hashed_name(quiz_id, digest, extension):
+    """내용 해시가 들어간 이미지 파일명"""
+    return f'quiz_{quiz_id}_{digest[:HASH_LENGTH]}.{extension}'
+
+def is_immutable_name(filename):
+    """내용 해시 파일명(또는 그 파생본)인지 확인"""
+    return bool(HASHED_NAME_RE.match(os.path.basename(filename)))
+
+def save_hashed(stream, upload_folder, quiz_id, extension, chunk_size=64 * 1024):
+    """
+    업로드 스트림을 임시 파일에 쓰면서 해시를 계산한 뒤 해시 파일명으로 저장
+    같은 내용의 파일이 이미 있으면 그대로 둡니다. 저장된 파일명을 반환합니다.
+    """
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(upload_folder, f'.upload_{quiz_id}_{os.getpid()}_{threading.get_ident()}.tmp')
+
+    try:
+        with open(tmp_path, 'wb') as tmp_file:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                tmp_file.write(chunk)
+
+        filename = hashed_name(quiz_id, digest.hexdigest(), extension)
+        os.replace(tmp_path, os.path.join(upload_folder, filename))
+        return filename
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def mark_replaced(filename, upload_folder):
+    """교체된 이미지의 수정 시각을 지금으로 바꿔 유예 기간이 교체 시점부터 시작되도록 함"""
+    path = os.path.join(upload_folder, filename)
+    if os.path.exists(path):
+        os.utime(path)
+
+def collect_orphans(upload_folder, referenced, grace_period=ORPHAN_GRACE_PERIOD):
+    """
+    어떤 퀴즈도 참조하지 않는 업로드 이미지와 파생본 삭제
+    referenced 는 퀴즈들의 image_path 집합이며, 최근에 바뀐 파일은 grace_period 동안 남겨둡니다.
+    삭제한 원본 파일명 목록을 반환합니다.
+    """
+    removed = []
+    cutoff = time.time() - grace_period
+
+    for filename in os.listdir(upload_folder):
+        path = os.path.join(upload_folder, filename)
+        if filename in referenced or not MANAGED_NAME_RE.match(filename) or not os.path.isfile(path):
+            continue
+
+        try:
+            if os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            delete_derivatives(filename, upload_folder)
+            removed.append(filename)
+        except OSError as e:
+            print(f"{filename}: 이미지 정리 실패 - {e}")
+
+    return removed
+
+def rehash_existing(upload_folder):
+    """기존 quiz_{id}_scene.* 이미지를 내용 해시 파일명으로 옮기고 DB 경로 갱신"""
+    renamed_count = 0
+    for quiz in database.get_all_quizzes():
+        image_path = quiz[6]
+        if not image_path or is_immutable_name(image_path):
+            continue
+
+        path = os.path.join(upload_folder, image_path)
+        if not os.path.exists(path):
+            print(f"{image_path}: 파일이 없어 건너뜀")
+            continue
+
+        extension = image_path.rsplit('.', 1)[1].lower() if '.' in image_path else 'png'
+        with open(path, 'rb') as source:
+            new_filename = save_hashed(source, upload_folder, quiz[0], extension)
+
+        # 파생본은 새 이름으로 옮기고, 없으면 새로 생성
+        for old_name, new_name in [(thumbnail_name(image_path), thumbnail_name(new_filename))] + \
+                [(scene_name(image_path, w), scene_name(new_filename, w)) for w in SCENE_WIDTHS]:
+            old_derived = os.path.join(upload_folder, old_name)
+            if os.path.exists(old_derived):
+                os.replace(old_derived, os.path.join(upload_folder, new_name))
+        forget(image_path)
+        if is_available() and not get_derivatives(new_filename, upload_folder)['thumbnail']:
+            generate_derivatives(new_filename, upload_folder)
+
+        # 이전 파일은 열려 있는 화면을 위해 남겨두고 gc 에서 정리
+        database.update_quiz_image(quiz[0], new_filename)
+        mark_replaced(image_path, upload_folder)
+        renamed_count += 1
+        print(f"{image_path} → {new_filename} ✓")
+
+    print(f"\n총 {renamed_count}개 이미지의 파일명을 변경했습니다.")
+    return renamed_count
+
+def detect_image_format(stream):
+    """
+    이미지 형식 확인 (Pillow 가 있으면 디코딩 검사까지, 없으면 파일 시그니처만)
+    저장할 확장자를 반환하며 이미지가 아니거나 손상되었으면 None 입니다. 스트림 위치는 되돌려 놓습니다.
+    """
+    start = stream.tell()
+    try:
+        if Image is None:
+            header = stream.read(12)
+            if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+                return 'webp'
+            for signature, extension in IMAGE_SIGNATURES:
+                if header.startswith(signature):
+                    return extension
+            return None
+
+        try:
+            with Image.open(stream) as image:
+                image.verify()
+                return PIL_FORMATS.get(image.format)
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            return None
+    finally:
+        stream.seek(start)
+
+def _ingest_one(source, quiz_id, current_path, upload_folder):
+    """파일 하나를 검사해 해시 파일명으로 저장하고 파생본 생성 (작업 스레드에서 실행, 저장된 파일명 반환)"""
+    with (open(source, 'rb') if isinstance(source, str) else nullcontext(source)) as stream:
+        extension = detect_image_format(stream)
+        if extension is None:
+            raise ValueError('이미지 파일이 아니거나 손상되었습니다.')
+        filename = save_hashed(stream, upload_folder, quiz_id, extension)
+
+    # 이미 등록된 같은 이미지는 파생본이 없을 때만 다시 만듦
+    if filename != current_path or not get_derivatives(filename, upload_folder)['thumbnail']:
+        generate_derivatives(filename, upload_folder)
+    return filename
+
+def ingest_images(sources, upload_folder, workers=INGEST_WORKERS):
+    """
+    수동 이미지 일괄 등록
+    sources 는 (파일명, 경로 또는 바이너리 스트림) 목록이며 파일명의 퀴즈 ID 로 대상 퀴즈를 찾습니다.
+    반환값: {'total', 'updated', 'unchanged', 'failed', 'elapsed',
+             'results': [{'filename', 'quiz_id', 'status', 'message', 'image_path'}, ...]}
+    """
+    started = time.perf_counter()
+    matches = [(name, source, MANUAL_NAME_RE.match(os.path.basename(name))) for name, source in sources]
+    id_counts = Counter(int(match.group(1)) for _, _, match in matches if match)
+    results = []
+    jobs = []  # (결과 항목, 원본, 퀴즈 ID, 현재 이미지 경로)
+
+    for name, source, match in matches:
+        result = {'filename': name, 'quiz_id': None, 'status': 'error', 'message': '', 'image_path': None}
+        results.append(result)
+
+        if not match:
+            result['message'] = '파일명이 quiz_{퀴즈ID}_manual.png 형식이 아닙니다.'
+            continue
+
+        quiz_id = int(match.group(1))
+        result['quiz_id'] = quiz_id
+        quiz = database.get_quiz_by_id(quiz_id)
+        if quiz is None:
+            result['message'] = '퀴즈를 찾을 수 없습니다.'
+            continue
+        if id_counts[quiz_id] > 1:
+            # 어느 파일이 맞는지 알 수 없으므로 모두 등록하지 않음
+            result['message'] = '같은 퀴즈 ID 의 파일이 여러 개입니다.'
+            continue
+
+        jobs.append((result, source, quiz_id, quiz[6]))
+
+    # 검사, 해시 저장, 파생본 생성은 파일마다 독립적이라 병렬로 처리 (Pillow 와 hashlib 은 GIL 을 놓음)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_ingest_one, source, quiz_id, current_path, upload_folder)
+                   for _, source, quiz_id, current_path in jobs]
+
+    changed = {}  # 퀴즈 ID -> (결과 항목, 이전 이미지 경로)
+    for (result, _, quiz_id, current_path), future in zip(jobs, futures):
+        try:
+            filename = future.result()
+        except Exception as e:
+            result['message'] = str(e)
+            continue
+
+        result['image_path'] = filename
+        if filename == current_path:
+            result['status'] = 'unchanged'
+            result['message'] = '이미 등록된 이미지입니다.'
+        else:
+            changed[quiz_id] = (result, current_path)
+
+    if changed:
+        try:
+            updated = database.update_quiz_images({quiz_id: result['image_path']
+                                                   for quiz_id, (result, _) in changed.items()})
+        except Exception as e:
+            print(f"이미지 경로 일괄 업데이트 오류: {e}")
+            updated = set()
+            for result, _ in changed.values():
+                result['message'] = f'데이터베이스 업데이트에 실패했습니다: {e}'
+
+        for quiz_id, (result, old_path) in changed.items():
+            if quiz_id in updated:
+                result['status'] = 'updated'
+                result['message'] = '이미지가 등록되었습니다.'
+                # 이전 이미지는 열려 있는 게임 화면을 위해 남겨두고 유예 기간 뒤 정리
+                if old_path:
+                    mark_replaced(old_path, upload_folder)
+            elif not result['message']:
+                result['message'] = '퀴즈가 삭제되어 등록하지 못했습니다.'
+
+    return {
+        'total': len(results),
+        'updated': sum(1 for result in results if result['status'] == 'updated'),
+        'unchanged': sum(1 for result in results if result['status'] == 'unchanged'),
+        'failed': sum(1 for result in results if result['status'] == 'error'),
+        'elapsed': round(time.perf_counter() - started, 3),
+        'results': results
+    }
+
+def backfill(upload_folder, force=False):
+    """기존 이미지들의 파생본 일괄 생성 (이미 있으면 건너뜀)"""
+    if not is_available():
+        print("Pillow 가 설치되어 있지 않아 파생본을 만들 수 없습니다. (pip install Pillow)")
+        return 0
+
+    created_count = 0
+    for filename in sorted(os.listdir(upload_folder)):
+        path = os.path.join(upload_folder, filename)
+        if not os.path.isfile(path):
+            continue
+
+        if not force and os.path.exists(os.path.join(upload_folder, thumbnail_name(filename))):
+            continue
+
+        try:
+            created = generate_derivatives(filename, upload_folder)
+            created_count += 1
+            print(f"{filename}: 파생본 {len(created)}개 생성 ✓")
+        except Exception as e:
+            print(f"{filename}: 파생본 생성 실패 - {e}")
+
+    print(f"\n총 {created_count}개 이미지의 파생본 생성 완료!")
+    return created_count
+
+if __name__ == "__main__":
+    # 사용법:
+    #   python image_pipeline.py backfill [--force]  기존 이미지 파생본 생성
+    #   python image_pipeline.py rehash              기존 이미지를 해시 파일명으로 변경
+    #   python image_pipeline.py gc                  참조되지 않는 이미지 정리
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == 'backfill':
+        backfill('static/images', force='--force' in sys.argv[2:])
+    elif command == 'rehash':
+        database.init_database()
+        rehash_existing('static/images')
+    elif command == 'gc':
+        database.init_database()
+        removed = collect_orphans('static/images', database.get_image_paths())
+        print(f"참조되지 않는 이미지 {len(removed)}개를 정리했습니다.")
+    else:
+        print("사용법: python image_pipeline.py [backfill [--force] | rehash | gc]")
+        sys.exit(1)
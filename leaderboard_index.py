@@ -0,0 +1,117 @@
+from bisect import bisect_left, insort
+
+# 리더보드 순위 계산용 메모리 자료구조
+# 정렬 기준은 database.get_leaderboard() 와 같습니다:
+# 점수 내림차순 → 완료 시간 오름차순 → 힌트 사용 오름차순 (완전히 같으면 먼저 등록한 기록이 위)
+DEFAULT_TOP_SIZE = 100
+
+class FenwickTree:
+    """점수별 기록 수를 누적하는 Fenwick(Binary Indexed) 트리"""
+
+    def __init__(self, size=1024):
+        self._tree = [0] * (size + 1)
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def _grow(self, min_size):
+        """점수 범위가 커지면 두 배씩 늘려서 다시 구성"""
+        size = len(self)
+        while size < min_size:
+            size *= 2
+
+        counts = [self.prefix_sum(i) - self.prefix_sum(i - 1) for i in range(len(self))]
+        self._tree = [0] * (size + 1)
+        for index, count in enumerate(counts):
+            if count:
+                self.add(index, count)
+
+    def add(self, index, delta=1):
+        """index 위치에 delta 더하기 (O(log n))"""
+        if index >= len(self):
+            self._grow(index + 1)
+
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index):
+        """0 ~ index 위치 값의 합 (O(log n))"""
+        if index < 0:
+            return 0
+
+        i = min(index, len(self) - 1) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+class LeaderboardIndex:
+    """
+    리더보드 상위 N개 목록과 순위/백분위 계산
+    점수 분포는 Fenwick 트리로, 같은 점수 안의 순서는 정렬된 리스트로 관리해
+    "전체 48,000명 중 312위" 같은 질문에 COUNT 없이 O(log n)으로 답합니다.
+    """
+
+    def __init__(self, top_size=DEFAULT_TOP_SIZE):
+        self.top_size = top_size
+        self.last_id = 0
+        self.total = 0
+        self._scores = FenwickTree()
+        self._ties = {}  # score -> [(completion_time, hints_used, id), ...] 정렬됨
+        self._keys = {}  # id -> (score, completion_time, hints_used)
+        self._top = []  # [((-score, completion_time, hints_used, id), record), ...] 정렬됨
+
+    def add(self, entry_id, record):
+        """
+        기록 추가
+        record 는 (player_name, total_rounds, hints_used, completion_time, score, completed_at)
+        """
+        hints_used, completion_time, score = record[2], record[3], record[4]
+
+        self._scores.add(score)
+        insort(self._ties.setdefault(score, []), (completion_time, hints_used, entry_id))
+        self._keys[entry_id] = (score, completion_time, hints_used)
+        self.total += 1
+        self.last_id = max(self.last_id, entry_id)
+
+        # 상위 N개 목록 유지
+        sort_key = (-score, completion_time, hints_used, entry_id)
+        if len(self._top) < self.top_size or sort_key < self._top[-1][0]:
+            insort(self._top, (sort_key, tuple(record)))
+            del self._top[self.top_size:]
+
+    def top(self, limit):
+        """상위 limit 개 기록 (limit 이 top_size 보다 크면 None)"""
+        if limit > self.top_size:
+            return None
+        return [record for _, record in self._top[:limit]]
+
+    def rank(self, score, completion_time, hints_used, entry_id=None):
+        """해당 기록의 순위 (1위부터, 등록 전 기록이면 entry_id 없이 예상 순위)"""
+        higher_scores = self.total - self._scores.prefix_sum(score)
+
+        ties = self._ties.get(score, [])
+        if entry_id is None:
+            # 아직 등록되지 않은 기록은 같은 조건의 기존 기록들보다 뒤에 위치
+            better_ties = bisect_left(ties, (completion_time, hints_used + 1, 0))
+        else:
+            better_ties = bisect_left(ties, (completion_time, hints_used, entry_id))
+
+        return higher_scores + better_ties + 1
+
+    def rank_of(self, entry_id):
+        """등록된 기록 ID의 순위 (없으면 None)"""
+        key = self._keys.get(entry_id)
+        if key is None:
+            return None
+        return self.rank(*key, entry_id=entry_id)
+
+    def percentile(self, rank, total=None):
+        """해당 순위보다 아래에 있는 기록 비율 (%)"""
+        total = self.total if total is None else total
+        if total <= 0:
+            return 100.0
+        return round((total - rank) / total * 100, 1)
@@ -0,0 +1,46 @@
+import json
+import threading
+import time
+
+import database
+
+# 리더보드 관람용 화면 갱신 (조건부 폴링)
+# /leaderboard?live=1 화면은 POLL_INTERVAL 마다 상위 목록 JSON 을 If-None-Match 로 요청합니다.
+# JSON 은 리더보드 버전을 키로 렌더링 캐시에 저장되므로, 기록이 바뀌지 않았으면 본문 없는 304 로 끝나고
+# 새 기록이 생기면 워커마다 한 번만 목록을 만듭니다. 요청이 짧게 끝나므로 화면 수만큼 스레드를 점유하지 않습니다.
+# DB 의 버전은 워커마다 VERSION_CHECK_INTERVAL 에 한 번만 읽으므로 화면이 늘어도 DB 조회는 늘지 않습니다.
+TOP_LIMIT = 50  # /leaderboard 페이지와 같은 상위 기록 수
+POLL_INTERVAL = 3  # 관람용 화면이 새 기록을 확인하는 간격 (초, 템플릿에 그대로 전달)
+VERSION_CHECK_INTERVAL = 0.5  # 워커가 DB 의 리더보드 버전을 다시 읽는 최소 간격 (초)
+
+class VersionCache:
+    """리더보드 버전을 VERSION_CHECK_INTERVAL 동안 재사용"""
+
+    def __init__(self, check_interval=VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            return self._version
+
+        with self._lock:
+            if self._version is None or now - self._checked_at >= self.check_interval:
+                self._version = database.get_data_versions('leaderboard')
+                self._checked_at = now
+            return self._version
+
+_versions = VersionCache()
+
+def current_version():
+    """렌더링 캐시 키로 쓰는 리더보드 버전 (최대 VERSION_CHECK_INTERVAL 만큼 늦을 수 있음)"""
+    return _versions.get()
+
+def render_payload():
+    """관람용 화면에 보낼 상위 목록 JSON"""
+    records = database.get_leaderboard(TOP_LIMIT)
+    return json.dumps({'total': database.get_leaderboard_count(),
+                       'records': [list(record) for record in records]}, ensure_ascii=False)
@@ -0,0 +1,147 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+import database
+import metrics
+
+# 리더보드 지연 기록 (write-behind)
+# 기록 등록 요청은 워커 안의 제한된 큐에 넣고 바로 응답하며, 기록 스레드가 큐에 쌓인 기록을
+# BATCH_SIZE 개가 모이거나 FLUSH_INTERVAL 이 지나면 한 트랜잭션(커밋 한 번)으로 저장합니다.
+# 이벤트가 끝나 여러 명이 한꺼번에 등록해도 SQLite 쓰기 잠금을 기록 수만큼 기다리지 않습니다.
+# 큐가 가득 차면 submit() 이 False 를 반환하므로 호출한 쪽에서 바로 저장합니다.
+# 프로세스 종료 시(atexit, gunicorn worker_exit) 남은 기록을 모두 저장한 뒤 끝냅니다.
+QUEUE_SIZE = 1024  # 저장을 기다릴 수 있는 기록 수
+BATCH_SIZE = 64  # 한 트랜잭션에 저장할 최대 기록 수
+FLUSH_INTERVAL = 0.05  # 첫 기록이 들어온 뒤 저장까지 기다리는 최대 시간 (초)
+MAX_RETRIES = 3  # 저장 실패(잠금 시간 초과 등) 시 같은 묶음을 다시 시도하는 횟수
+SHUTDOWN_TIMEOUT = 10  # 종료 시 남은 기록 저장을 기다리는 최대 시간 (초)
+
+class LeaderboardWriter:
+    """리더보드 기록을 모아서 저장하는 기록 스레드"""
+
+    def __init__(self, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(queue_size)
+        self._pending = 0  # 큐에 있거나 저장 중인 기록 수
+        self._pending_changed = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='leaderboard-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, entry):
+        """
+        기록 저장 예약 (player_name, total_rounds, hints_used, completion_time, score)
+        큐가 가득 찼거나 종료 중이면 False (호출한 쪽에서 직접 저장)
+        """
+        with self._pending_changed:
+            if self._closed:
+                return False
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                metrics.increment('leaderboard_write_behind_total', ('queue_full',))
+                return False
+            self._pending += 1
+        return True
+
+    def flush(self, timeout=None):
+        """지금까지 예약된 기록이 모두 저장될 때까지 대기 (시간 안에 끝나면 True)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_changed:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_changed.wait(remaining)
+        return True
+
+    def close(self, timeout=SHUTDOWN_TIMEOUT):
+        """새 예약을 막고 남은 기록을 모두 저장한 뒤 기록 스레드 종료"""
+        with self._pending_changed:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)  # 종료 표시 (남은 기록 뒤에 들어감)
+        self._thread.join(timeout)
+        if self._pending:
+            print(f"리더보드 지연 기록 종료: 저장하지 못한 기록 {self._pending}개")
+
+    def _next_batch(self):
+        """첫 기록을 기다린 뒤 BATCH_SIZE 개 또는 FLUSH_INTERVAL 까지 모은 묶음 (종료 표시를 만나면 stop=True)"""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _write(self, batch):
+        """묶음을 한 트랜잭션으로 저장 (실패하면 MAX_RETRIES 번까지 다시 시도)"""
+        for attempt in range(MAX_RETRIES + 1):
+            if database.add_leaderboard_entries(batch) is not None:
+                metrics.increment('leaderboard_write_behind_total', ('written',), len(batch))
+                return
+            time.sleep(self.flush_interval * (attempt + 1))
+
+        metrics.increment('leaderboard_write_behind_total', ('failed',), len(batch))
+        print(f"리더보드 지연 기록 실패: 기록 {len(batch)}개를 저장하지 못했습니다. {batch}")
+
+    def _run(self):
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"리더보드 지연 기록 오류: {e}")
+                finally:
+                    with self._pending_changed:
+                        self._pending -= len(batch)
+                        self._pending_changed.notify_all()
+        finally:
+            database.close_connection()
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    """현재 프로세스의 리더보드 기록 스레드 (처음 호출 시 시작)"""
+    global _writer, _writer_pid
+
+    # fork 된 워커에서는 스레드가 복사되지 않으므로 프로세스별로 새로 만듦
+    if _writer is not None and _writer_pid == os.getpid():
+        return _writer
+
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer, _writer_pid = LeaderboardWriter(), os.getpid()
+        return _writer
+
+def shutdown():
+    """남은 기록을 저장하고 기록 스레드 종료 (시작된 적 없으면 아무것도 하지 않음)"""
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.close()
+
+atexit.register(shutdown)
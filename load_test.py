@@ -0,0 +1,249 @@
+import argparse
+import html
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from http.cookiejar import CookieJar
+
+# 부하 테스트
+# 가상 플레이어 여러 명이 동시에 실제 게임 흐름을 진행합니다.
+#   /play/enter → /play/game → (/play/hint? → /play/answer) 반복 → /play/clear
+#   → /leaderboard/register → /leaderboard   (목숨을 다 쓰면 /play/over)
+# 앱을 같은 프로세스에서 직접 호출하거나(기본값, DB 복사본 사용) --url 로 실행 중인 서버에 요청합니다.
+#
+# 사용법:
+#   python load_test.py --players 20 --games 5
+#   python load_test.py --url http://127.0.0.1:5000 --db escape_room_quizzes.db --players 50
+DEFAULT_PLAYERS = 10
+DEFAULT_GAMES = 3
+DEFAULT_WRONG_RATE = 0.2  # 오답을 제출할 확률
+DEFAULT_HINT_RATE = 0.3  # 방마다 힌트를 요청할 확률
+
+_TITLE_RE = re.compile(r'<title>방탈출 게임 - (.*?)</title>', re.S)
+_LOCK_ERROR_TEXT = 'database is locked'
+
+class InProcessClient:
+    """Flask test_client 로 앱을 직접 호출 (플레이어마다 쿠키 분리)"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self._client.open(path, method=method, data=data)
+        return response.status_code, response.get_data(as_text=True), response.headers.get('Location', '')
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """리다이렉트를 따라가지 않음 (라우트별 지연 시간을 따로 재기 위해)"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+class HttpClient:
+    """실행 중인 서버에 HTTP 로 요청 (플레이어마다 쿠키 분리)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect)
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        if method == 'POST' and body is None:
+            body = b''
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self._opener.open(req, timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8', 'replace'), ''
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace'), e.headers.get('Location', '')
+
+class Stats:
+    """라우트별 지연 시간과 오류 집계 (스레드 안전)"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # 라우트 -> [초, ...]
+        self.errors = defaultdict(int)  # 라우트 -> 5xx 또는 연결 오류 수
+        self.lock_errors = 0
+        self.games = defaultdict(int)  # 'cleared' / 'over' / 'aborted' -> 판 수
+        self._lock = threading.Lock()
+
+    def record(self, route, elapsed, status, body):
+        with self._lock:
+            self.latencies[route].append(elapsed)
+            if status >= 500 or status == 0:
+                self.errors[route] += 1
+            if _LOCK_ERROR_TEXT in body:
+                self.lock_errors += 1
+
+    def finish_game(self, outcome):
+        with self._lock:
+            self.games[outcome] += 1
+
+def percentile(sorted_values, percent):
+    """정렬된 값의 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100 + 0.5) - 1))
+    return sorted_values[index]
+
+def load_answers(db_path):
+    """방 이름 -> 정답 (플레이어가 화면 제목으로 정답을 찾기 위해 사용)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {room_name: answer for room_name, answer in conn.execute('SELECT room_name, answer FROM quizzes')}
+    finally:
+        conn.close()
+
+def _call(client, stats, route, method, path, data=None):
+    started = time.perf_counter()
+    try:
+        status, body, location = client.request(method, path, data)
+    except Exception as e:
+        status, body, location = 0, str(e), ''
+    stats.record(route, time.perf_counter() - started, status, body)
+    return status, body, location
+
+def play_game(client, stats, answers, player_name, rng, wrong_rate, hint_rate):
+    """한 판 진행 ('cleared', 'over', 'aborted' 중 하나 반환)"""
+    status, _, _ = _call(client, stats, '/play/enter', 'POST', '/play/enter')
+    if status != 302:
+        return 'aborted'
+
+    # 게임 화면은 처음 한 번만 불러오고, 이후 방은 정답 응답의 next 로 전환 (브라우저와 같은 흐름)
+    status, body, _ = _call(client, stats, '/play/game', 'GET', '/play/game')
+    if status != 200:
+        return 'aborted'
+    match = _TITLE_RE.search(body)
+    room_name = html.unescape(match.group(1)) if match else None
+
+    for _ in range(100):  # 최대 라운드(20) x 목숨을 넉넉히 넘는 안전장치
+        answer = answers.get(room_name)
+        if answer is None:
+            return 'aborted'
+
+        if rng.random() < hint_rate:
+            _call(client, stats, '/play/hint', 'POST', '/play/hint')
+
+        submitted = answer if rng.random() >= wrong_rate else f'오답{rng.randint(0, 9999)}'
+        status, body, _ = _call(client, stats, '/play/answer', 'POST', '/play/answer', {'answer': submitted})
+        if status != 200:
+            return 'aborted'
+
+        result = json.loads(body)
+        if result.get('redirect', '').endswith('/play/over'):
+            _call(client, stats, '/play/over', 'GET', '/play/over')
+            return 'over'
+        if 'next' in result:
+            room_name = result['next']['room']['room_name']
+        elif result.get('correct'):
+            if not result.get('redirect', '').endswith('/play/clear'):
+                return 'aborted'
+            break
+    else:
+        return 'aborted'
+
+    _call(client, stats, '/play/clear', 'GET', '/play/clear')
+    _call(client, stats, '/leaderboard/register', 'POST', '/leaderboard/register', {'player_name': player_name})
+    _call(client, stats, '/leaderboard', 'GET', '/leaderboard')
+    return 'cleared'
+
+def run(make_client, answers, players, games, wrong_rate, hint_rate, seed=None):
+    """가상 플레이어들을 동시에 실행하고 집계 결과와 걸린 시간을 반환"""
+    stats = Stats()
+    start_barrier = threading.Barrier(players)
+
+    def player(index):
+        rng = random.Random(None if seed is None else seed + index)
+        client = make_client()
+        start_barrier.wait()
+        for game in range(games):
+            outcome = play_game(client, stats, answers, f'부하{index}-{game}', rng, wrong_rate, hint_rate)
+            stats.finish_game(outcome)
+
+    threads = [threading.Thread(target=player, args=(i,), name=f'player-{i}') for i in range(players)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - started
+
+def print_report(stats, elapsed):
+    """라우트별 요청 수, 오류, 지연 시간 백분위수와 전체 처리량 출력"""
+    print(f"\n{'라우트':<24} {'요청':>7} {'오류':>5} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'최대(ms)':>9}")
+    total_requests = 0
+    for route in sorted(stats.latencies):
+        values = sorted(stats.latencies[route])
+        total_requests += len(values)
+        print(f"{route:<24} {len(values):>7} {stats.errors[route]:>5} "
+              f"{percentile(values, 50) * 1000:>9.1f} {percentile(values, 95) * 1000:>9.1f} "
+              f"{percentile(values, 99) * 1000:>9.1f} {values[-1] * 1000:>9.1f}")
+
+    print(f"\n총 {total_requests}개 요청, {elapsed:.2f}초, 처리량 {total_requests / elapsed:.1f} req/s")
+    print(f"게임: 클리어 {stats.games['cleared']}판, 게임 오버 {stats.games['over']}판, "
+          f"중단 {stats.games['aborted']}판")
+    print(f"오류: 5xx/연결 오류 {sum(stats.errors.values())}개, SQLite 잠금 오류 {stats.lock_errors}개")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='방탈출 게임 부하 테스트')
+    parser.add_argument('--url', help='실행 중인 서버 주소 (생략하면 같은 프로세스에서 앱 실행)')
+    parser.add_argument('--db', help='정답을 읽을 DB 파일 (기본값: database.DATABASE_NAME)')
+    parser.add_argument('--in-place', action='store_true', help='같은 프로세스 실행 시 DB 복사본 대신 원본 사용')
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS, help='동시 플레이어 수')
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help='플레이어당 게임 수')
+    parser.add_argument('--wrong-rate', type=float, default=DEFAULT_WRONG_RATE, help='오답 제출 확률')
+    parser.add_argument('--hint-rate', type=float, default=DEFAULT_HINT_RATE, help='힌트 요청 확률')
+    parser.add_argument('--seed', type=int, help='재현용 난수 시드')
+    args = parser.parse_args(argv)
+
+    import database
+    db_path = args.db or database.DATABASE_NAME
+
+    # 같은 프로세스 실행은 리더보드 기록과 게임 세션이 쌓이므로 기본적으로 임시 복사본에서 실행
+    tmp_dir = None
+    if not args.url and not args.in_place:
+        tmp_dir = tempfile.mkdtemp(prefix='load_test_')
+        shutil.copy(db_path, os.path.join(tmp_dir, os.path.basename(db_path)))
+        db_path = os.path.join(tmp_dir, os.path.basename(db_path))
+
+    try:
+        if args.url:
+            make_client = lambda: HttpClient(args.url)
+        else:
+            database.DATABASE_NAME = db_path
+            from app import create_app, warm_up
+            app = create_app()
+            warm_up(app)
+            make_client = lambda: InProcessClient(app)
+
+        answers = load_answers(db_path)
+        if not answers:
+            print("퀴즈가 없어 부하 테스트를 진행할 수 없습니다.")
+            return 1
+
+        target = args.url or f'같은 프로세스 ({db_path})'
+        print(f"대상: {target}, 플레이어 {args.players}명 x {args.games}판")
+        stats, elapsed = run(make_client, answers, args.players, args.games,
+                             args.wrong_rate, args.hint_rate, args.seed)
+        print_report(stats, elapsed)
+        return 1 if stats.lock_errors or any(stats.errors.values()) else 0
+    finally:
+        # 임시 복사본은 실행이 끝나면 삭제 (WAL 파일 포함)
+        if tmp_dir is not None:
+            database.close_connection()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
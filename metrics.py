@@ -0,0 +1,207 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+# 요청/DB 호출 지표 수집 (Prometheus 텍스트 형식으로 노출)
+# 값은 스레드마다 따로 쌓고(잠금 없음) /admin/metrics 조회 때만 합칩니다.
+# 종료된 스레드의 값은 조회 시 누적분으로 옮겨 스레드가 늘어나도 합산 비용이 커지지 않게 합니다.
+PREFIX = 'escape_room_'
+
+# 히스토그램 구간 (상한값, 마지막 +Inf 는 자동 추가)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DB_CALL_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+DB_TIME_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('요청 처리 시간', ('endpoint', 'method', 'status'), LATENCY_BUCKETS),
+    'db_calls_per_request': ('요청당 database 함수 호출 수', ('endpoint',), DB_CALL_BUCKETS),
+    'db_time_per_request_seconds': ('요청당 database 함수 실행 시간', ('endpoint',), DB_TIME_BUCKETS),
+}
+COUNTERS = {
+    'db_calls_total': ('database 함수 호출 수', ('function',)),
+    'db_call_seconds_total': ('database 함수 누적 실행 시간', ('function',)),
+    'render_cache_requests_total': ('렌더링 캐시 조회 수 (hit, miss, bypass)', ('page', 'result')),
+    'leaderboard_write_behind_total': ('리더보드 지연 기록 수 (written, failed, queue_full)', ('result',)),
+}
+
+# 연결 관리 함수는 매 요청 호출되므로 DB 호출로 세지 않음
+UNINSTRUMENTED_FUNCTIONS = frozenset({'get_connection', 'release_connection', 'close_connection', 'init_database'})
+
+class _Shard:
+    """한 스레드가 쌓는 지표 값"""
+    __slots__ = ('thread', 'histograms', 'counters')
+
+    def __init__(self, thread):
+        self.thread = thread
+        self.histograms = {}  # (이름, 라벨 값들) -> [구간별 개수..., +Inf 개수, 합계]
+        self.counters = {}  # (이름, 라벨 값들) -> 값
+
+_local = threading.local()
+_shards = []
+_retired = _Shard(None)  # 종료된 스레드들의 값
+_shards_lock = threading.Lock()  # 스레드 등록과 조회 시에만 사용
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _Shard(threading.current_thread())
+        with _shards_lock:
+            _shards.append(shard)
+        _local.shard = shard
+    return shard
+
+def observe(name, labels, value):
+    """히스토그램에 값 기록"""
+    histograms = _shard().histograms
+    key = (name, labels)
+    counts = histograms.get(key)
+    if counts is None:
+        counts = histograms[key] = [0] * (len(HISTOGRAMS[name][2]) + 2)
+    counts[bisect_left(HISTOGRAMS[name][2], value)] += 1
+    counts[-1] += value
+
+def increment(name, labels, value=1):
+    """카운터 증가"""
+    counters = _shard().counters
+    key = (name, labels)
+    counters[key] = counters.get(key, 0) + value
+
+def _merge_into(target, shard):
+    for key, counts in shard.histograms.copy().items():
+        merged = target.histograms.get(key)
+        if merged is None:
+            target.histograms[key] = list(counts)
+        else:
+            for i, count in enumerate(counts):
+                merged[i] += count
+    for key, value in shard.counters.copy().items():
+        target.counters[key] = target.counters.get(key, 0) + value
+
+def snapshot():
+    """전체 스레드 값을 합친 _Shard (종료된 스레드는 누적분으로 옮김)"""
+    total = _Shard(None)
+    with _shards_lock:
+        for shard in [s for s in _shards if not s.thread.is_alive()]:
+            _merge_into(_retired, shard)
+            _shards.remove(shard)
+        _merge_into(total, _retired)
+        for shard in _shards:
+            _merge_into(total, shard)
+    return total
+
+# ==================== database 함수 계측 ====================
+
+def _instrument(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # database 함수 안에서 다른 database 함수를 부르면 바깥 호출만 셈
+        depth = getattr(_local, 'db_depth', 0)
+        if depth:
+            return func(*args, **kwargs)
+
+        _local.db_depth = 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _local.db_depth = 0
+            _local.db_calls = getattr(_local, 'db_calls', 0) + 1
+            _local.db_time = getattr(_local, 'db_time', 0.0) + elapsed
+            increment('db_calls_total', (name,))
+            increment('db_call_seconds_total', (name,), elapsed)
+    return wrapper
+
+def instrument_module(module):
+    """모듈의 공개 함수들을 호출 수/시간을 세는 래퍼로 교체 (여러 번 호출해도 한 번만 적용)"""
+    for name, func in list(vars(module).items()):
+        if (name.startswith('_') or name in UNINSTRUMENTED_FUNCTIONS or not inspect.isfunction(func)
+                or func.__module__ != module.__name__ or hasattr(func, '__wrapped__')):
+            continue
+        setattr(module, name, _instrument(name, func))
+
+# ==================== Flask 요청 계측 ====================
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    _local.db_calls = 0
+    _local.db_time = 0.0
+
+def _record(status):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    endpoint = request.endpoint or 'unmatched'  # 404 는 경로 대신 하나의 라벨로 묶음
+    observe('http_request_duration_seconds', (endpoint, request.method, str(status)),
+            time.perf_counter() - started)
+    observe('db_calls_per_request', (endpoint,), getattr(_local, 'db_calls', 0))
+    observe('db_time_per_request_seconds', (endpoint,), getattr(_local, 'db_time', 0.0))
+
+def _after_request(response):
+    _record(response.status_code)
+    return response
+
+def _teardown_request(exception=None):
+    # 처리되지 않은 예외로 after_request 가 실행되지 않은 경우
+    if exception is not None:
+        _record(500)
+
+def init_app(app):
+    """요청 시간/DB 호출 수집 훅 등록"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+# ==================== Prometheus 텍스트 형식 ====================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render(gauges=None):
+    """
+    Prometheus 텍스트 형식 문자열
+    gauges 는 조회 시점에 계산한 {이름: (설명, 값)} 입니다.
+    """
+    total = snapshot()
+    lines = []
+
+    for name, (help_text, label_names, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} histogram')
+        for (metric, values), counts in sorted(total.histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + ('+Inf',), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{_format(float(bound))}"'
+                lines.append(f'{PREFIX}{name}_bucket{_labels(label_names, values, le)} {cumulative}')
+            lines.append(f'{PREFIX}{name}_sum{_labels(label_names, values)} {_format(float(counts[-1]))}')
+            lines.append(f'{PREFIX}{name}_count{_labels(label_names, values)} {cumulative}')
+
+    for name, (help_text, label_names) in COUNTERS.items():
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} counter')
+        for (metric, values), value in sorted(total.counters.items()):
+            if metric == name:
+                lines.append(f'{PREFIX}{name}{_labels(label_names, values)} {_format(value)}')
+
+    for name, (help_text, value) in (gauges or {}).items():
+        lines.append(f'# HELP {PREFIX}{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}{name} gauge')
+        lines.append(f'{PREFIX}{name} {_format(value)}')
+
+    return '\n'.join(lines) + '\n'
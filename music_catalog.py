@@ -0,0 +1,342 @@
+import hashlib
+import os
+import random
+import struct
+import threading
+import time
+import wave
+from collections import namedtuple
+
+# 배경음악 목록 인덱스
+# 음악 폴더를 매번 listdir 하지 않고, 폴더의 수정 시각이 바뀌었을 때만 다시 읽습니다.
+# 파일별 정보(크기, 수정 시각, 재생 시간, 내용 해시)는 파일이 바뀌지 않았으면 재사용합니다.
+CHECK_INTERVAL = 1.0  # 폴더 변경 확인 최소 간격 (초)
+HASH_LENGTH = 16
+HASH_CHUNK_SIZE = 1024 * 1024
+MP3_SCAN_SIZE = 64 * 1024  # 첫 프레임을 찾을 때 읽는 최대 크기
+
+MusicTrack = namedtuple('MusicTrack', ['name', 'size', 'mtime', 'duration', 'etag'])
+
+# MPEG Layer III 헤더 해석용 표
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = (44100, 48000, 32000)
+
+def _file_hash(path):
+    """파일 내용 해시 (ETag 로 사용)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def _mp3_duration(path, size):
+    """
+    MP3 재생 시간 (초)
+    첫 프레임의 Xing/Info/VBRI 헤더에 프레임 수가 있으면 그것으로, 없으면 고정 비트레이트로 계산합니다.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(10)
+        offset = 0
+        if head[:3] == b'ID3' and len(head) == 10:
+            # ID3v2 태그 크기 (syncsafe 정수) + 헤더, 푸터가 있으면 10바이트 추가
+            offset = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+            if head[5] & 0x10:
+                offset += 10
+        f.seek(offset)
+        data = f.read(MP3_SCAN_SIZE)
+
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+            continue
+
+        version_bits = (data[i + 1] >> 3) & 0x03  # 3: MPEG1, 2: MPEG2, 0: MPEG2.5
+        layer_bits = (data[i + 1] >> 1) & 0x03  # 1: Layer III
+        bitrate_index = data[i + 2] >> 4
+        sample_rate_index = (data[i + 2] >> 2) & 0x03
+        if version_bits == 1 or layer_bits != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            continue
+
+        mpeg1 = version_bits == 3
+        bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[sample_rate_index] >> (0 if mpeg1 else 1 if version_bits == 2 else 2)
+        samples_per_frame = 1152 if mpeg1 else 576
+        mono = (data[i + 3] >> 6) == 3
+
+        # VBR 파일은 첫 프레임에 전체 프레임 수가 기록되어 있음
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = i + 4 + side_info
+        if data[xing:xing + 4] in (b'Xing', b'Info'):
+            flags = struct.unpack_from('>I', data, xing + 4)[0]
+            if flags & 1:
+                frames = struct.unpack_from('>I', data, xing + 8)[0]
+                return round(frames * samples_per_frame / sample_rate, 1)
+        vbri = i + 4 + 32
+        if data[vbri:vbri + 4] == b'VBRI':
+            frames = struct.unpack_from('>I', data, vbri + 14)[0]
+            return round(frames * samples_per_frame / sample_rate, 1)
+
+        return round((size - offset - i) * 8 / bitrate, 1)
+
+    return None
+
+def _wav_duration(path):
+    """WAV 재생 시간 (초)"""
+    with wave.open(path, 'rb') as w:
+        return round(w.getnframes() / w.getframerate(), 1)
+
+def read_duration(path, size):
+    """재생 시간 (초, 알 수 없는 형식이면 None)"""
+    extension = path.rsplit('.', 1)[-1].lower()
+    try:
+        if extension == 'mp3':
+            return _mp3_duration(path, size)
+        if extension == 'wav':
+            return _wav_duration(path)
+    except (OSError, EOFError, wave.Error, struct.error) as e:
+        print(f"{os.path.basename(path)}: 재생 시간 확인 실패 - {e}")
+    return None
+
+class MusicCatalog:
+    """음악 폴더의 트랙 목록 (폴더가 바뀌었을 때만 다시 읽음)"""
+
+    def __init__(self, folder, extensions):
+        self.folder = folder
+        self.extensions = frozenset(extensions)
+        self._tracks = {}  # name -> MusicTrack
+        self._names = ()  # 이름순 정렬
+        self._dir_mtime = None
+        self._checked_at = 0.0
+        self._version = 0  # 트랙 목록이 바뀔 때마다 증가
+        self._lock = threading.Lock()
+
+    def _allowed(self, filename):
+        return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.extensions
+
+    def _scan_file(self, name, stat):
+        """파일 하나의 트랙 정보 (크기와 수정 시각이 같으면 기존 정보 재사용)"""
+        track = self._tracks.get(name)
+        if track and track.size == stat.st_size and track.mtime == stat.st_mtime:
+            return track
+
+        path = os.path.join(self.folder, name)
+        return MusicTrack(name, stat.st_size, stat.st_mtime,
+                          read_duration(path, stat.st_size), _file_hash(path))
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            if now - self._checked_at < CHECK_INTERVAL:
+                return
+            try:
+                dir_mtime = os.stat(self.folder).st_mtime_ns
+            except FileNotFoundError:
+                if self._names:
+                    self._version += 1
+                self._tracks, self._names, self._dir_mtime = {}, (), None
+                self._checked_at = now
+                return
+
+            if dir_mtime != self._dir_mtime:
+                tracks = {}
+                with os.scandir(self.folder) as entries:
+                    for entry in entries:
+                        if not self._allowed(entry.name) or not entry.is_file():
+                            continue
+                        try:
+                            tracks[entry.name] = self._scan_file(entry.name, entry.stat())
+                        except OSError as e:
+                            print(f"{entry.name}: 음악 파일 확인 실패 - {e}")
+                self._tracks = tracks
+                self._names = tuple(sorted(tracks))
+                self._dir_mtime = dir_mtime
+                self._version += 1
+            self._checked_at = now
+
+    def invalidate(self):
+        """다음 조회 때 폴더를 다시 읽도록 표시 (업로드/삭제 직후 호출)"""
+        with self._lock:
+            self._dir_mtime = None
+            self._checked_at = 0.0
+
+    def tracks(self):
+        """전체 트랙 목록 (이름순)"""
+        self._refresh()
+        tracks = self._tracks
+        return [tracks[name] for name in self._names]
+
+    def names(self):
+        """전체 트랙 파일명 (이름순)"""
+        self._refresh()
+        return list(self._names)
+
+    @property
+    def version(self):
+        """트랙 목록(이름, 크기, 재생 시간)이 바뀔 때마다 달라지는 값 (렌더링 캐시 키용)"""
+        self._refresh()
+        return self._version
+
+    def count(self):
+        """트랙 수"""
+        self._refresh()
+        return len(self._names)
+
+    def get(self, name):
+        """
+        트랙 정보 조회 (없으면 None)
+        같은 이름으로 덮어쓴 파일은 폴더 수정 시각이 바뀌지 않으므로 파일 크기/수정 시각도 확인합니다.
+        """
+        self._refresh()
+        track = self._tracks.get(name)
+        if track is None:
+            return None
+
+        try:
+            stat = os.stat(os.path.join(self.folder, name))
+        except FileNotFoundError:
+            self.invalidate()
+            return None
+
+        if stat.st_size != track.size or stat.st_mtime != track.mtime:
+            with self._lock:
+                track = self._scan_file(name, stat)
+                tracks = dict(self._tracks)
+                tracks[name] = track
+                self._tracks = tracks
+                self._version += 1
+        return track
+
+    def random_track(self):
+        """랜덤 트랙 (없으면 None)"""
+        self._refresh()
+        names = self._names
+        if not names:
+            return None
+        return self._tracks.get(random.choice(names))
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def get_catalog(folder, extensions):
+    """폴더별 음악 목록 인덱스 (프로세스마다 하나)"""
+    key = os.path.abspath(folder)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(key, MusicCatalog(folder, extensions))
+    return catalog
+
+def _chunks(stream, chunk_size):
+    """스트림을 chunk_size 씩 읽고 끝나면 None 을 한 번 돌려줌 (MultipartDecoder 종료 신호)"""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        yield data
+    yield None
+
+class _UploadFile:
+    """업로드 중인 파일 하나 (임시 파일에 쓰면서 크기와 해시 계산)"""
+
+    def __init__(self, folder, filename, max_size):
+        self.filename = filename
+        self.max_size = max_size
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.tmp_path = os.path.join(folder, f'.upload_{os.getpid()}_{threading.get_ident()}_{time.monotonic_ns()}.tmp')
+        self._file = open(self.tmp_path, 'wb')
+
+    def write(self, data):
+        """데이터 기록 (크기 제한을 넘으면 False)"""
+        self.size += len(data)
+        if self.size > self.max_size:
+            return False
+        self.digest.update(data)
+        self._file.write(data)
+        return True
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def receive_uploads(stream, boundary, catalog, max_file_size, field_name='music_files', chunk_size=64 * 1024):
+    """
+    multipart 요청 본문을 메모리에 쌓지 않고 파일별로 바로 디스크에 저장
+    파일마다 크기 제한은 받는 도중에 확인하고, 이미 있는 곡과 내용이 같으면 저장하지 않습니다.
+    반환값: [{'filename', 'status': 'uploaded' | 'duplicate' | 'error', 'saved_as', 'message'}, ...]
+    """
+    # 지연 import: werkzeug 는 업로드 처리에만 필요
+    from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
+    from werkzeug.utils import secure_filename
+
+    known = {track.etag: track.name for track in catalog.tracks()}  # 내용 해시 -> 파일명
+    results = []
+    current = None  # 저장 중인 _UploadFile (None 이면 현재 파트의 데이터는 버림)
+
+    def finish(upload):
+        upload.close()
+        etag = upload.digest.hexdigest()[:HASH_LENGTH]
+        if etag in known:
+            os.remove(upload.tmp_path)
+            return {'filename': upload.filename, 'status': 'duplicate', 'saved_as': known[etag],
+                    'message': f'이미 같은 곡이 {known[etag]} 으로 등록되어 있습니다.'}
+
+        # 한글 등만으로 된 이름은 secure_filename 후 비어버리므로 해시로 이름을 만듦
+        filename = secure_filename(upload.filename)
+        extension = upload.filename.rsplit('.', 1)[1].lower()
+        if not filename.lower().endswith('.' + extension):
+            filename = f'music_{etag[:8]}.{extension}'
+
+        # 같은 이름의 다른 곡이 있으면 번호를 붙여 저장
+        base_name, ext = os.path.splitext(filename)
+        name, counter = filename, 1
+        while os.path.exists(os.path.join(catalog.folder, name)):
+            name = f'{base_name}_{counter}{ext}'
+            counter += 1
+        os.replace(upload.tmp_path, os.path.join(catalog.folder, name))
+        known[etag] = name
+        return {'filename': upload.filename, 'status': 'uploaded', 'saved_as': name, 'message': '업로드 완료'}
+
+    decoder = MultipartDecoder(boundary.encode())
+    try:
+        for chunk in _chunks(stream, chunk_size):
+            decoder.receive_data(chunk)
+            event = decoder.next_event()
+            while not isinstance(event, (Epilogue, NeedData)):
+                if isinstance(event, File) and event.name == field_name and event.filename:
+                    if catalog._allowed(event.filename):
+                        current = _UploadFile(catalog.folder, event.filename, max_file_size)
+                    else:
+                        results.append({'filename': event.filename, 'status': 'error', 'saved_as': None,
+                                        'message': '지원하지 않는 파일 형식입니다.'})
+                elif isinstance(event, Data) and current is not None:
+                    if not current.write(event.data):
+                        current.discard()
+                        results.append({'filename': current.filename, 'status': 'error', 'saved_as': None,
+                                        'message': f'파일 크기가 {max_file_size // (1024 * 1024)}MB를 초과합니다.'})
+                        current = None
+                    elif not event.more_data:
+                        try:
+                            results.append(finish(current))
+                        except OSError as e:
+                            current.discard()
+                            results.append({'filename': current.filename, 'status': 'error', 'saved_as': None,
+                                            'message': f'업로드 실패 - {e}'})
+                        current = None
+                event = decoder.next_event()
+    finally:
+        # 요청이 중간에 끊기면 쓰던 임시 파일 정리
+        if current is not None:
+            current.discard()
+        catalog.invalidate()
+
+    return results
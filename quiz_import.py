@@ -0,0 +1,97 @@
+import sys
+import time
+
+import database
+from quiz_parser import iter_quiz_blocks, validate_quiz
+
+# 퀴즈 대량 가져오기
+# 번호가 붙은 "방의 이름 / 방의 배경 묘사 / 문제 / 힌트 / 답" 형식의 텍스트를 블록별로 검사한 뒤
+# 통과한 블록을 한 트랜잭션으로 추가하고 블록별 결과를 보고합니다.
+def import_quiz_text(text, dry_run=False, strict=False):
+    """텍스트의 퀴즈들을 검사하고 추가 (import_quiz_lines 참고)"""
+    return import_quiz_lines(text.splitlines(), dry_run, strict)
+
+def import_quiz_lines(lines, dry_run=False, strict=False):
+    """
+    줄 iterator(파일 객체 등)의 퀴즈들을 검사하고 추가
+    dry_run 이면 검사만 하고, strict 이면 하나라도 실패한 블록이 있을 때 아무것도 추가하지 않습니다.
+    반환값: {'total', 'imported', 'failed', 'elapsed',
+             'results': [{'block', 'line', 'room_name', 'status', 'message', 'quiz_id'}, ...]}
+    """
+    started = time.perf_counter()
+    results = []
+    valid = []  # (결과 항목, 퀴즈) 목록
+
+    for parsed in iter_quiz_blocks(lines):
+        result = {'block': parsed.number, 'line': parsed.line, 'room_name': None,
+                  'status': 'error', 'message': '', 'quiz_id': None}
+        results.append(result)
+
+        quiz = parsed.quiz
+        if not quiz:
+            result['message'] = parsed.error
+            continue
+
+        result['room_name'] = quiz['room_name']
+        is_valid, message = validate_quiz(quiz)
+        if not is_valid:
+            result['message'] = f"{parsed.line}번째 줄에서 시작하는 퀴즈: {message}"
+            continue
+
+        result['status'] = 'valid'
+        result['message'] = message
+        valid.append((result, quiz))
+
+    failed = len(results) - len(valid)
+    imported = 0
+
+    if dry_run:
+        return _finish(results, imported, failed, started)
+
+    if strict and failed:
+        for result, _ in valid:
+            result['status'] = 'skipped'
+            result['message'] = "다른 블록의 오류로 추가하지 않았습니다."
+    elif valid:
+        quiz_ids = database.add_quizzes_bulk([quiz for _, quiz in valid])
+        for (result, _), quiz_id in zip(valid, quiz_ids):
+            result['status'] = 'imported'
+            result['quiz_id'] = quiz_id
+            result['message'] = "추가되었습니다."
+        imported = len(quiz_ids)
+
+    return _finish(results, imported, failed, started)
+
+def _finish(results, imported, failed, started):
+    """가져오기 결과 보고서"""
+    return {
+        'total': len(results),
+        'imported': imported,
+        'failed': failed,
+        'elapsed': round(time.perf_counter() - started, 3),
+        'results': results
+    }
+
+def print_report(report, verbose=False):
+    """가져오기 결과 출력 (verbose 가 아니면 실패한 블록만)"""
+    for result in report['results']:
+        if verbose or result['status'] == 'error':
+            name = result['room_name'] or '(이름 없음)'
+            mark = '✓' if result['status'] in ('imported', 'valid') else '✗'
+            print(f"{result['block']:4d}. {name} - {result['message']} {mark}")
+
+    print(f"\n총 {report['total']}개 블록 중 {report['imported']}개 추가, "
+          f"{report['failed']}개 실패 ({report['elapsed']}초)")
+
+if __name__ == "__main__":
+    # 사용법: python quiz_import.py <퀴즈 텍스트 파일> [--dry-run] [--strict] [--verbose]
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(paths) != 1:
+        print("사용법: python quiz_import.py <퀴즈 텍스트 파일> [--dry-run] [--strict] [--verbose]")
+        sys.exit(1)
+
+    database.init_database()
+    with open(paths[0], encoding='utf-8-sig') as f:
+        report = import_quiz_lines(f, dry_run='--dry-run' in sys.argv, strict='--strict' in sys.argv)
+    print_report(report, verbose='--verbose' in sys.argv)
+    sys.exit(1 if report['failed'] else 0)
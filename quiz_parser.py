@@ -1,4 +1,106 @@
 import re
+from collections import namedtuple
+
+# 퀴즈 텍스트 파서
+# 한 줄씩 읽으면서 "번호. → 방의 이름 → 방의 배경 묘사 → 문제 → 힌트 → 답" 순서로 상태를 옮기는
+# 단일 패스 파서입니다. 파일이나 줄 iterator 를 그대로 받아 퀴즈를 하나씩 돌려주므로
+# 문서 전체를 메모리에 올리지 않아도 됩니다.
+FIELDS = ('room_name', 'background_description', 'question', 'hint', 'answer')
+FIELD_LABELS = {
+    'room_name': '방의 이름',
+    'background_description': '방의 배경 묘사',
+    'question': '문제',
+    'hint': '힌트',
+    'answer': '답',
+}
+MULTILINE_FIELDS = ('background_description', 'question', 'hint')
+
+# "3." 으로 시작하는 줄은 새 퀴즈 블록 (3.14 처럼 숫자가 이어지면 블록 번호가 아님)
+_BLOCK_START_RE = re.compile(r'(\d+)\.(?!\d)\s*(.*)$')
+# 항목 머리글: 콜론(: 또는 ：)이 있거나 머리글만 있는 줄
+_HEADER_RE = re.compile(r'(방의\s*이름|방의\s*배경\s*묘사|문제|힌트|답)\s*([:：])?\s*(.*?)\s*$')
+_HEADER_INDEX = {'방의이름': 0, '방의배경묘사': 1, '문제': 2, '힌트': 3, '답': 4}  # 공백 제거한 머리글 -> FIELDS 위치
+# 콜론 없이 공백 뒤에 내용이 이어져도 머리글로 인정하는 항목 ("답 열쇠", "방의 이름 서재" 같은 기존 형식)
+# 본문이 "문제 해결은 ..." 처럼 시작할 수 있는 나머지 항목은 콜론이 있거나 머리글만 있는 줄이어야 함
+_INLINE_HEADER_INDEXES = frozenset({0, 4})
+_HEADER_FIRST_CHARS = frozenset('방문힌답')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_SPACES_RE = re.compile(r'[ \t]+')
+
+ParsedBlock = namedtuple('ParsedBlock', ['number', 'line', 'quiz', 'error'])
+
+def _build_block(number, line, sections):
+    """모은 항목 줄들로 ParsedBlock 생성 (필수 항목이 빠졌으면 quiz 는 None)"""
+    quiz = {}
+    for field in FIELDS:
+        value = '\n'.join(sections.get(field, ())).strip()
+        if field in MULTILINE_FIELDS:
+            # 줄바꿈 보존하되 연속된 줄바꿈은 정리, 탭과 연속 공백만 정리
+            value = _SPACES_RE.sub(' ', _BLANK_LINES_RE.sub('\n\n', value).strip())
+        quiz[field] = value
+
+    missing = [FIELD_LABELS[field] for field in FIELDS if not quiz[field]]
+    if missing:
+        error = f"{line}번째 줄에서 시작하는 퀴즈에 {', '.join(missing)} 항목이 없습니다."
+        return ParsedBlock(number, line, None, error)
+    return ParsedBlock(number, line, quiz, None)
+
+def iter_quiz_blocks(lines):
+    """
+    줄 iterator(파일 객체, 리스트 등)를 한 번만 읽으며 퀴즈 블록을 하나씩 반환하는 제너레이터
+    각 항목은 ParsedBlock(번호, 시작 줄 번호, 퀴즈 딕셔너리 또는 None, 오류 메시지 또는 None) 입니다.
+    번호 없이 시작하는 첫 퀴즈는 0번 블록으로 처리합니다.
+    """
+    number = None  # 현재 블록 번호 (None 이면 블록 밖)
+    start_line = 0
+    sections = {}  # 항목 -> 줄 목록
+    current = -1  # 현재 항목의 FIELDS 내 위치
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        stripped = line.lstrip()
+        if not stripped:
+            if current >= 0:
+                sections[FIELDS[current]].append('')
+            continue
+
+        # 대부분의 줄은 본문이므로 첫 글자로 정규식 검사 여부를 먼저 거름
+        if stripped[0].isdigit():
+            block_start = _BLOCK_START_RE.match(stripped)
+            if block_start:
+                if number is not None and sections:
+                    yield _build_block(number, start_line, sections)
+                number, start_line, sections, current = int(block_start.group(1)), line_no, {}, -1
+                line = stripped = block_start.group(2)
+                if not stripped:
+                    continue
+
+        # 항목 머리글은 순서대로만 인정 (본문 중의 "문제:" 같은 줄은 내용으로 취급)
+        if stripped[0] in _HEADER_FIRST_CHARS:
+            header = _HEADER_RE.match(stripped)
+            if header:
+                index = _HEADER_INDEX[''.join(header.group(1).split())]
+                if header.group(3) and not header.group(2) and not (
+                        index in _INLINE_HEADER_INDEXES and stripped[header.end(1)].isspace()):
+                    index = -1  # "답변은 ..." 처럼 머리글 단어로 시작하는 본문
+                if index > current:
+                    if number is None:
+                        number, start_line = 0, line_no
+                    rest = header.group(3)
+                    sections[FIELDS[index]] = [rest] if rest else []
+                    current = index
+                    continue
+
+        if current >= 0:
+            sections[FIELDS[current]].append(line)
+
+    if number is not None and sections:
+        yield _build_block(number, start_line, sections)
+
+def parse_quiz_file(path, encoding='utf-8-sig'):
+    """텍스트 파일에서 퀴즈 블록을 하나씩 읽는 제너레이터 (iter_quiz_blocks 참고)"""
+    with open(path, encoding=encoding) as f:
+        yield from iter_quiz_blocks(f)
 
 def parse_quiz_text(text):
     """
@@ -7,20 +109,11 @@ def parse_quiz_text(text):
     """
     quizzes = []
     
-    # 숫자로 시작하는 각 퀴즈를 분리
-    quiz_blocks = re.split(r'\n\s*\d+\.\s*', text.strip())
-    
-    # 첫 번째 빈 요소 제거
-    if quiz_blocks and not quiz_blocks[0].strip():
-        quiz_blocks = quiz_blocks[1:]
-    
-    for block in quiz_blocks:
-        if not block.strip():
-            continue
-            
-        quiz = parse_single_quiz(block)
-        if quiz:
-            quizzes.append(quiz)
+    for block in iter_quiz_blocks(text.splitlines()):
+        if block.quiz:
+            quizzes.append(block.quiz)
+        else:
+            print(f"퀴즈 파싱 실패: {block.error}")
     
     return quizzes
 
@@ -28,41 +121,14 @@ def parse_single_quiz(block):
     """
     단일 퀴즈 블록을 파싱하여 딕셔너리로 반환
     """
-    try:
-        # 각 섹션을 구분하는 패턴
-        patterns = {
-            'room_name': r'방의\s*이름\s*[:：]\s*(.+?)(?=\n방의\s*배경\s*묘사|\n문제|\Z)',
-            'background_description': r'방의\s*배경\s*묘사\s*[:：]?\s*\n(.+?)(?=\n문제|\Z)',
-            'question': r'문제\s*[:：]?\s*\n(.+?)(?=\n힌트|\Z)',
-            'hint': r'힌트\s*[:：]?\s*\n(.+?)(?=\n답|\Z)',
-            'answer': r'답\s*[:：]?\s*\n?(.+?)(?=\n\d+\.|\Z)'
-        }
-        
-        quiz = {}
-        
-        for key, pattern in patterns.items():
-            match = re.search(pattern, block, re.DOTALL | re.IGNORECASE)
-            if match:
-                value = match.group(1).strip()
-                # 줄바꿈 보존하되 연속된 줄바꿈은 정리
-                if key in ['background_description', 'question', 'hint']:
-                    value = re.sub(r'\n\s*\n', '\n\n', value).strip()  # 연속 줄바꿈 정리
-                    value = re.sub(r'[ \t]+', ' ', value)  # 탭과 연속 공백만 정리
-                quiz[key] = value
-            else:
-                quiz[key] = ""
-        
-        # 필수 필드가 모두 있는지 확인
-        required_fields = ['room_name', 'background_description', 'question', 'hint', 'answer']
-        if all(quiz.get(field) for field in required_fields):
-            return quiz
-        else:
-            print(f"퀴즈 파싱 실패: 필수 필드 누락 - {quiz}")
-            return None
-            
-    except Exception as e:
-        print(f"퀴즈 파싱 중 오류 발생: {e}")
+    for parsed in iter_quiz_blocks(block.splitlines()):
+        if parsed.quiz:
+            return parsed.quiz
+        print(f"퀴즈 파싱 실패: {parsed.error}")
         return None
+    
+    print("퀴즈 파싱 실패: 퀴즈 항목을 찾을 수 없습니다.")
+    return None
 
 def validate_quiz(quiz):
     """
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import Response, request, session
+
+import metrics
+
+# 렌더링된 페이지 캐시
+# 페이지가 보여주는 데이터의 버전(data_versions, 집계 값 등)을 키에 넣으므로 데이터가 바뀌면
+# 키가 달라져 새로 렌더링되고, 더 이상 쓰이지 않는 예전 항목은 LRU 로 밀려납니다.
+# 본문 해시를 ETag 로 보내 같은 페이지를 다시 요청하면 본문 없이 304 로 응답합니다.
+# 워커(프로세스)마다 따로 유지합니다.
+MAX_ENTRIES = 512
+MAX_BYTES = 16 * 1024 * 1024  # 캐시된 본문 크기 합계 상한
+
+# 캐시된 페이지 (UTF-8 본문, ETag, 렌더링 시각)
+CachedPage = namedtuple('CachedPage', ('body', 'etag', 'last_modified'))
+
+class RenderCache:
+    """항목 수와 본문 크기 합계가 제한된 LRU 캐시 (키 -> CachedPage)"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0  # 캐시된 본문 크기 합계
+        self._entries = OrderedDict()  # 오래 안 쓴 것부터
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            page = self._entries.get(key)
+            if page is not None:
+                self._entries.move_to_end(key)
+            return page
+
+    def put(self, key, html):
+        """렌더링 결과 저장 (상한을 넘으면 오래 안 쓴 항목부터 제거)"""
+        body = html.encode('utf-8')
+        page = CachedPage(body, hashlib.blake2b(body, digest_size=16).hexdigest(), time.time())
+        if len(body) > self.max_bytes:
+            return page
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self._entries[key] = page
+            self.size += len(body)
+
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return page
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+_cache = RenderCache()
+
+def get_cache():
+    """워커(프로세스)에서 공유하는 렌더링 캐시"""
+    return _cache
+
+def _page_response(page, mimetype):
+    """캐시된 페이지 응답 (If-None-Match/If-Modified-Since 가 맞으면 304)"""
+    response = Response(page.body, mimetype=mimetype)
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    # 브라우저가 저장해 두되 매번 ETag 로 다시 확인하도록 함
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def cached_page(name, key, render, mimetype='text/html'):
+    """
+    렌더링 캐시를 거친 응답 (기본은 HTML, JSON 등은 mimetype 지정)
+    key 는 페이지가 보여주는 데이터의 버전들이며, 캐시에 없을 때만 render() 를 호출합니다.
+    flash 메시지가 남아 있으면 그 요청에서만 보여야 하므로 캐시를 거치지 않습니다.
+    """
+    if '_flashes' in session:
+        metrics.increment('render_cache_requests_total', (name, 'bypass'))
+        return Response(render(), mimetype=mimetype)
+
+    page = _cache.get((name, key))
+    if page is None:
+        page = _cache.put((name, key), render())
+        metrics.increment('render_cache_requests_total', (name, 'miss'))
+    else:
+        metrics.increment('render_cache_requests_total', (name, 'hit'))
+    return _page_response(page, mimetype)
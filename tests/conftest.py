@@ -0,0 +1,23 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# 앱 모듈은 저장소 최상위에 있으므로 어디서 pytest 를 실행해도 import 되도록 경로 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import database
+
+SAMPLE_DB = os.path.join(ROOT, database.DATABASE_NAME)
+
+@pytest.fixture
+def quiz_db(tmp_path, monkeypatch):
+    """저장소의 퀴즈 DB 복사본을 database 모듈이 쓰도록 설정 (테스트가 끝나면 연결을 닫음)"""
+    db_path = tmp_path / 'quizzes.db'
+    shutil.copy(SAMPLE_DB, db_path)
+    monkeypatch.setattr(database, 'DATABASE_NAME', str(db_path))
+    database.init_database()
+    yield str(db_path)
+    database.close_connection()
@@ -0,0 +1,42 @@
+import answer_matcher
+
+def test_normalize_answer_ignores_width_case_and_spaces():
+    assert answer_matcher.normalize_answer(' Ａｂ  C\t d ') == 'abcd'
+    assert answer_matcher.normalize_answer('') == ''
+    assert answer_matcher.normalize_answer(None) == ''
+
+def test_normalize_answer_unifies_nfc_and_nfd():
+    nfd = '\u1100\u1161\u11a8'  # '각' 을 자모로 풀어 쓴 형태
+    assert answer_matcher.normalize_answer(nfd) == answer_matcher.normalize_answer('각')
+
+def test_answer_keys_dedupe_and_keep_order():
+    assert answer_matcher.answer_keys('열쇠', ' Key, 열 쇠 ,,KEY') == ['열쇠', 'key']
+
+def test_encode_decode_roundtrip():
+    keys = answer_matcher.answer_keys('정답', '별칭')
+    assert answer_matcher.decode_keys(answer_matcher.encode_keys(keys)) == frozenset(keys)
+    assert answer_matcher.decode_keys('') == frozenset()
+
+def test_is_correct_exact_match():
+    keys = answer_matcher.decode_keys(answer_matcher.encode_keys(answer_matcher.answer_keys('비밀의 방', 'secret room')))
+    assert answer_matcher.is_correct('비밀의방', keys)
+    assert answer_matcher.is_correct('SECRET  ROOM', keys)
+    assert not answer_matcher.is_correct('비밀방', keys)
+    assert not answer_matcher.is_correct('   ', keys)
+
+def test_is_correct_allows_typo_only_when_enabled():
+    keys = frozenset(['도서관'])
+    assert not answer_matcher.is_correct('도서곤', keys)
+    assert answer_matcher.is_correct('도서곤', keys, max_distance=1)  # 모음 하나 차이
+    assert not answer_matcher.is_correct('도서', keys, max_distance=1)
+
+def test_is_correct_requires_exact_digits():
+    keys = frozenset(['1234'])
+    assert answer_matcher.is_correct('1234', keys, max_distance=2)
+    assert not answer_matcher.is_correct('1235', keys, max_distance=2)
+
+def test_within_distance():
+    assert answer_matcher.within_distance('abc', 'abc', 0)
+    assert answer_matcher.within_distance('abc', 'abd', 1)
+    assert not answer_matcher.within_distance('abc', 'xyz', 2)
+    assert not answer_matcher.within_distance('a', 'abcd', 2)
@@ -0,0 +1,53 @@
+import pytest
+
+import game_deck
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100, 1000])
+def test_deck_index_is_a_permutation(size):
+    for seed in (0, 1, 0xDEADBEEF):
+        values = [game_deck.deck_index(seed, cursor, size) for cursor in range(size)]
+        assert sorted(values) == list(range(size))
+
+def test_deck_index_depends_on_seed():
+    orders = {tuple(game_deck.deck_index(seed, cursor, 50) for cursor in range(50)) for seed in range(5)}
+    assert len(orders) > 1
+
+def test_deck_index_rejects_cursor_out_of_range():
+    with pytest.raises(ValueError):
+        game_deck.deck_index(1, 10, 10)
+    with pytest.raises(ValueError):
+        game_deck.deck_index(1, -1, 10)
+
+def test_draw_deals_every_quiz_once_per_pass():
+    quiz_ids = tuple(range(1, 31))
+    deck = None
+    drawn = []
+    for _ in quiz_ids:
+        quiz_id, deck = game_deck.draw(deck, quiz_ids)
+        drawn.append(quiz_id)
+    assert sorted(drawn) == list(quiz_ids)
+
+def test_draw_keeps_deck_when_quizzes_change():
+    quiz_ids = list(range(1, 21))
+    deck = None
+    drawn = []
+    for _ in range(5):
+        quiz_id, deck = game_deck.draw(deck, tuple(quiz_ids))
+        drawn.append(quiz_id)
+    seed = deck['seed']
+    
+    # 아직 안 나온 퀴즈 하나를 삭제하고 새 퀴즈 두 개를 추가
+    deleted = next(quiz_id for quiz_id in quiz_ids if quiz_id not in drawn)
+    quiz_ids.remove(deleted)
+    quiz_ids += [21, 22]
+    
+    while len(drawn) < len(quiz_ids):
+        quiz_id, deck = game_deck.draw(deck, tuple(quiz_ids))
+        drawn.append(quiz_id)
+    
+    assert deck['seed'] == seed  # 다시 섞지 않음
+    assert sorted(drawn) == sorted(quiz_ids)
+    assert deleted not in drawn
+
+def test_draw_without_quizzes():
+    assert game_deck.draw(None, ()) == (None, None)
@@ -0,0 +1,36 @@
+from game_session import GameState
+
+def test_game_state_roundtrip():
+    state = GameState(total_rounds=5, lives=3, max_hints=4, start_time=1700000000.25)
+    state.current_round = 3
+    state.hints_used = 2
+    state.current_quiz_id = 42
+    state.deck = {'seed': 0xFFFFFFFF, 'cursor': 7, 'size': 120}
+    state.completed_quiz_ids.extend([5, 17, 99])
+    
+    restored = GameState.from_bytes(state.to_bytes())
+    for name in GameState.__slots__:
+        assert getattr(restored, name) == getattr(state, name), name
+    assert restored.deck == {'seed': 0xFFFFFFFF, 'cursor': 7, 'size': 120}
+
+def test_game_state_optional_fields():
+    state = GameState(total_rounds=1)
+    restored = GameState.from_bytes(state.to_bytes())
+    assert restored.current_quiz_id is None
+    assert restored.final_score is None
+    assert restored.completion_time is None
+    assert restored.deck is None
+    assert len(restored.completed_quiz_ids) == 0
+    
+    state.active = False
+    state.final_score = 0
+    state.completion_time = 0
+    restored = GameState.from_bytes(state.to_bytes())
+    assert restored.active is False
+    assert restored.final_score == 0
+    assert restored.completion_time == 0
+
+def test_game_state_negative_lives():
+    state = GameState(total_rounds=1, lives=0)
+    state.lives -= 1
+    assert GameState.from_bytes(state.to_bytes()).lives == -1
@@ -0,0 +1,61 @@
+import random
+
+from leaderboard_index import FenwickTree, LeaderboardIndex
+
+def test_fenwick_prefix_sums():
+    tree = FenwickTree(8)
+    for index, delta in [(0, 1), (3, 2), (7, 5), (3, 1)]:
+        tree.add(index, delta)
+    assert [tree.prefix_sum(i) for i in range(8)] == [1, 1, 1, 4, 4, 4, 4, 9]
+    assert tree.prefix_sum(-1) == 0
+    assert tree.prefix_sum(100) == 9
+
+def test_fenwick_grows_past_initial_size():
+    tree = FenwickTree(4)
+    tree.add(1)
+    tree.add(10, 3)
+    assert len(tree) >= 11
+    assert tree.prefix_sum(1) == 1
+    assert tree.prefix_sum(10) == 4
+
+def _record(name, hints_used, completion_time, score):
+    return (name, 10, hints_used, completion_time, score, '2024-01-01 00:00:00')
+
+def _sort_key(entry_id, record):
+    """database.get_leaderboard() 와 같은 정렬 기준"""
+    return (-record[4], record[3], record[2], entry_id)
+
+def test_rank_matches_sorted_order():
+    rng = random.Random(7)
+    index = LeaderboardIndex(top_size=10)
+    records = {}
+    for entry_id in range(1, 301):
+        record = _record(f'p{entry_id}', rng.randint(0, 3), rng.randint(60, 90), rng.randint(0, 40) * 25)
+        records[entry_id] = record
+        index.add(entry_id, record)
+    
+    ordered = sorted(records, key=lambda entry_id: _sort_key(entry_id, records[entry_id]))
+    for rank, entry_id in enumerate(ordered, 1):
+        assert index.rank_of(entry_id) == rank
+    
+    assert index.top(10) == [records[entry_id] for entry_id in ordered[:10]]
+    assert index.top(11) is None
+    assert index.total == 300
+
+def test_rank_of_unregistered_record_goes_after_ties():
+    index = LeaderboardIndex()
+    index.add(1, _record('a', 1, 100, 500))
+    index.add(2, _record('b', 1, 100, 500))
+    index.add(3, _record('c', 0, 50, 900))
+    assert index.rank(500, 100, 1) == 4
+    assert index.rank(500, 90, 1) == 2
+    assert index.rank(1000, 200, 5) == 1
+    assert index.rank_of(99) is None
+
+def test_percentile():
+    index = LeaderboardIndex()
+    assert index.percentile(1) == 100.0
+    for entry_id in range(1, 11):
+        index.add(entry_id, _record('p', 0, entry_id, 100))
+    assert index.percentile(1) == 90.0
+    assert index.percentile(10) == 0.0
@@ -0,0 +1,7 @@
+import check_query_plans
+import database
+
+def test_hot_paths_use_indexes(quiz_db, capsys):
+    database.reconcile_stats()
+    failures = check_query_plans.check()
+    assert failures == 0, capsys.readouterr().out
@@ -0,0 +1,62 @@
+import quiz_parser
+
+SAMPLE = """
+1. 방의 이름: 거울의 미궁
+방의 배경 묘사
+사방이 거울로 둘러싸인 방.
+
+바닥에도 거울이 있다.
+문제
+실제로 열 수 있는 문은 몇 개인가?
+문제: 본문 속 머리글은 내용으로 취급
+힌트
+거울에 비치는 문은 실제 문이 아니다.
+답
+1
+
+2. 방의 이름: 빈 방
+방의 배경 묘사
+아무것도 없다.
+답: 없음
+
+3.
+방의 이름 서재
+방의 배경 묘사: 오래된 책들
+문제: 3.14 로 시작하는 줄은 새 블록이 아니다
+3.14
+힌트: 원주율
+답 파이
+"""
+
+def test_iter_quiz_blocks_parses_blocks_in_order():
+    blocks = list(quiz_parser.iter_quiz_blocks(SAMPLE.splitlines(True)))
+    assert [block.number for block in blocks] == [1, 2, 3]
+    assert [block.line for block in blocks] == [2, 15, 20]
+
+def test_iter_quiz_blocks_fields():
+    first, _, third = quiz_parser.iter_quiz_blocks(SAMPLE.splitlines())
+    assert first.error is None
+    assert first.quiz['room_name'] == '거울의 미궁'
+    assert first.quiz['background_description'] == '사방이 거울로 둘러싸인 방.\n\n바닥에도 거울이 있다.'
+    assert first.quiz['question'] == '실제로 열 수 있는 문은 몇 개인가?\n문제: 본문 속 머리글은 내용으로 취급'
+    assert first.quiz['answer'] == '1'
+    
+    assert third.quiz['room_name'] == '서재'
+    assert third.quiz['question'] == '3.14 로 시작하는 줄은 새 블록이 아니다\n3.14'
+    assert third.quiz['answer'] == '파이'
+
+def test_iter_quiz_blocks_reports_missing_fields():
+    _, second, _ = quiz_parser.iter_quiz_blocks(SAMPLE.splitlines())
+    assert second.quiz is None
+    assert '15번째 줄' in second.error
+    assert '문제' in second.error and '힌트' in second.error
+
+def test_iter_quiz_blocks_without_number():
+    text = "방의 이름: 첫 방\r\n방의 배경 묘사: 배경\r\n문제: 문제\r\n힌트: 힌트\r\n답: 정답\r\n"
+    (block,) = quiz_parser.iter_quiz_blocks(iter(text.splitlines(True)))
+    assert block.number == 0
+    assert block.quiz['answer'] == '정답'
+
+def test_iter_quiz_blocks_empty_input():
+    assert list(quiz_parser.iter_quiz_blocks([])) == []
+    assert list(quiz_parser.iter_quiz_blocks(['머리글 없는 본문\n'])) == []
@@ -0,0 +1,84 @@
+import flask
+import pytest
+
+import render_cache
+from render_cache import RenderCache
+
+def test_lru_evicts_least_recently_used():
+    cache = RenderCache(max_entries=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    cache.get('a')
+    cache.put('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a').body == b'A'
+    assert len(cache) == 2
+
+def test_byte_limit():
+    cache = RenderCache(max_bytes=10)
+    cache.put('a', 'x' * 6)
+    cache.put('b', 'y' * 6)
+    assert cache.get('a') is None
+    assert cache.size == 6
+    
+    # 상한보다 큰 본문은 저장하지 않고 결과만 돌려줌
+    page = cache.put('big', 'z' * 11)
+    assert page.body == b'z' * 11
+    assert cache.get('big') is None
+
+def test_replacing_key_updates_size_and_etag():
+    cache = RenderCache()
+    first = cache.put('a', '하나')
+    second = cache.put('a', '둘둘')
+    assert cache.size == len('둘둘'.encode('utf-8'))
+    assert first.etag != second.etag
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.secret_key = 'test'
+    calls = []
+    
+    @app.route('/page/<int:version>')
+    def page(version):
+        def render():
+            calls.append(version)
+            return f'<p>{version}</p>'
+        return render_cache.cached_page('test_page', version, render)
+    
+    @app.route('/flash')
+    def flashed():
+        flask.flash('알림')
+        return render_cache.cached_page('test_page', 1, lambda: 'flash')
+    
+    render_cache.get_cache().clear()
+    client = app.test_client()
+    client.calls = calls
+    yield client
+    render_cache.get_cache().clear()
+
+def test_cached_page_renders_once_per_key(client):
+    first = client.get('/page/1')
+    second = client.get('/page/1')
+    assert first.data == second.data == b'<p>1</p>'
+    assert client.calls == [1]
+    
+    client.get('/page/2')
+    assert client.calls == [1, 2]
+
+def test_cached_page_returns_304_for_matching_etag(client):
+    first = client.get('/page/1')
+    etag = first.headers['ETag']
+    assert 'no-cache' in first.headers['Cache-Control']
+    
+    response = client.get('/page/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    assert client.get('/page/2', headers={'If-None-Match': etag}).status_code == 200
+
+def test_cached_page_bypasses_cache_with_pending_flash(client):
+    response = client.get('/flash')
+    assert response.data == b'flash'
+    assert 'ETag' not in response.headers
+    assert render_cache.get_cache().get(('test_page', 1)) is None
@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+
+import database
+import image_pipeline
+
+# 수동 이미지 일괄 등록 (manual_uploads/업로드_가이드.txt 참고)
+# 폴더의 quiz_{퀴즈ID}_manual.png 파일들을 병렬로 검사하고 해시 파일명으로 저장한 뒤
+# 바뀐 이미지 경로를 한 트랜잭션으로 반영합니다. 이미 등록된 파일은 다시 실행해도 바뀌지 않습니다.
+#
+# 사용법:
+#   python update_manual_images.py                  (manual_uploads 폴더)
+#   python update_manual_images.py 폴더 --workers 8 -v
+MANUAL_FOLDER = 'manual_uploads'
+UPLOAD_FOLDER = 'static/images'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+def collect_sources(folder):
+    """폴더의 이미지 파일 (파일명, 경로) 목록 (이름순, 안내 문서처럼 이미지가 아닌 파일은 제외)"""
+    return [(name, os.path.join(folder, name)) for name in sorted(os.listdir(folder))
+            if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(folder, name))]
+
+def print_report(report, verbose=False):
+    """등록 결과 출력 (verbose 가 아니면 변경 없음은 생략)"""
+    for result in report['results']:
+        if verbose or result['status'] != 'unchanged':
+            mark = '✗' if result['status'] == 'error' else '✓'
+            print(f"{result['filename']}: {result['message']} {mark}")
+
+    print(f"\n총 {report['total']}개 파일 중 {report['updated']}개 등록, {report['unchanged']}개 변경 없음, "
+          f"{report['failed']}개 실패 ({report['elapsed']}초)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='수동으로 만든 장면 이미지 일괄 등록')
+    parser.add_argument('folder', nargs='?', default=MANUAL_FOLDER, help=f'이미지 폴더 (기본값: {MANUAL_FOLDER})')
+    parser.add_argument('--workers', type=int, default=image_pipeline.INGEST_WORKERS, help='동시에 처리할 파일 수')
+    parser.add_argument('-v', '--verbose', action='store_true', help='변경 없는 파일도 출력')
+    args = parser.parse_args(argv)
+
+    sources = collect_sources(args.folder)
+    if not sources:
+        print(f"{args.folder} 폴더에 등록할 이미지가 없습니다.")
+        return 0
+
+    database.init_database()
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    report = image_pipeline.ingest_images(sources, UPLOAD_FOLDER, workers=args.workers)
+    print_report(report, args.verbose)
+    return 1 if report['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
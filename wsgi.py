@@ -0,0 +1,6 @@
+from app import create_app, warm_up
+
+# 운영용 WSGI 진입점 (gunicorn -c gunicorn.conf.py wsgi:app)
+# preload_app 설정이면 마스터 프로세스에서 한 번만 실행되고, 워커는 준비된 앱을 fork 로 물려받습니다.
+app = create_app()
+warm_up(app)